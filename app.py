@@ -1,20 +1,12 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import altair as alt
 from datetime import datetime, timedelta
 import json
-import os
 import sqlite3
 import uuid
-import time
 import hashlib
-import base64
-from io import StringIO, BytesIO
-import plotly.express as px
-import plotly.graph_objects as go
-from streamlit_option_menu import option_menu
+
+# pandas and plotly are most of the import time and only the pages that
+# build tables or charts need them, so those functions import them lazily
 
 # Function to load and apply CSS
 def load_css(file_name):
@@ -701,6 +693,8 @@ def restore_from_backup(backup_data, user_id):
 
 # Export Functions
 def export_tasks_to_csv(tasks):
+    import pandas as pd
+    
     try:
         df = pd.DataFrame(tasks)
         csv = df.to_csv(index=False)
@@ -819,6 +813,9 @@ def login_page():
 
 
 def dashboard_page():
+    import pandas as pd
+    import plotly.express as px
+    
     st.title(f"Welcome, {st.session_state.username}!")
     
     # Get task statistics
@@ -1147,6 +1144,8 @@ def add_task_page():
             st.experimental_rerun()
 
 def view_tasks_page():
+    import pandas as pd
+    
     st.title("View Tasks")
     
     # Filters
@@ -1197,11 +1196,12 @@ def view_tasks_page():
         # Reset all filters
         st.experimental_rerun()
     
-    # Get tasks with filters
-    tasks = get_tasks(st.session_state.user_id, filters=filters)
+    # Load the tasks once; sorting, the table columns and the task details
+    # below are all served from this frame without querying again
+    tasks_df = pd.DataFrame(get_tasks(st.session_state.user_id, filters=filters))
     
     # Display tasks
-    if tasks:
+    if not tasks_df.empty:
         # Sorting options
         col1, col2 = st.columns([1, 4])
         with col1:
@@ -1216,25 +1216,20 @@ def view_tasks_page():
                 horizontal=True
             )
         
-        # Sort tasks
-        tasks = get_tasks(
-            st.session_state.user_id, 
-            filters=filters,
-            sort_by=sort_by,
-            sort_order="asc" if sort_order == "Ascending" else "desc"
-        )
+        # Sort tasks in memory (empty values first when ascending, like SQLite)
+        ascending = sort_order == "Ascending"
+        tasks_df = tasks_df.sort_values(sort_by, ascending=ascending, na_position='first' if ascending else 'last', kind='stable')
+        tasks = tasks_df.to_dict('records')
         
         # Display tasks in a table
-        task_df = pd.DataFrame([
-            {
-                'Title': t['title'],
-                'Priority': t['priority'],
-                'Status': t['status'],
-                'Due Date': t['due_date'],
-                'Assigned To': t['assigned_to_name'],
-                'Tags': t['tags']
-            } for t in tasks
-        ])
+        task_df = tasks_df[['title', 'priority', 'status', 'due_date', 'assigned_to_name', 'tags']].rename(columns={
+            'title': 'Title',
+            'priority': 'Priority',
+            'status': 'Status',
+            'due_date': 'Due Date',
+            'assigned_to_name': 'Assigned To',
+            'tags': 'Tags'
+        })
         
         st.dataframe(task_df, use_container_width=True)
         
@@ -1266,14 +1261,16 @@ def view_tasks_page():
         
         # Task details section
         st.subheader("Task Details")
+        task_titles = dict(zip(tasks_df['id'], tasks_df['title']))
         selected_task_id = st.selectbox(
             "Select a task to view details",
-            options=[t['id'] for t in tasks],
-            format_func=lambda x: next((t['title'] for t in tasks if t['id'] == x), x)
+            options=list(task_titles),
+            format_func=lambda x: task_titles.get(x, x)
         )
         
         if selected_task_id:
-            selected_task = next((t for t in tasks if t['id'] == selected_task_id), None)
+            selected_rows = tasks_df[tasks_df['id'] == selected_task_id]
+            selected_task = selected_rows.iloc[0].to_dict() if not selected_rows.empty else None
             
             if selected_task:
                 with st.expander("Task Details", expanded=True):
@@ -1347,6 +1344,10 @@ def view_tasks_page():
             st.experimental_rerun()
 
 def statistics_page():
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     st.title("Task Statistics and Reports")
     
     # Get task statistics
@@ -78,3 +78,57 @@ def logout_user():
     for key in ['user_id', 'username', 'logged_in', 'theme']:
         if key in st.session_state:
             del st.session_state[key]
+
+def get_user_id_by_username(username):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
+        user = cursor.fetchone()
+        
+        conn.close()
+        return user['id'] if user else None
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+        return None
+
+def get_user(user_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            "SELECT id, username, email, created_at, last_login, theme FROM users WHERE id = ?",
+            (user_id,)
+        )
+        user = cursor.fetchone()
+        
+        conn.close()
+        return dict(user) if user else None
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+        return None
+
+def change_password(user_id, current_password, new_password):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Verify current password
+        cursor.execute("SELECT password FROM users WHERE id = ?", (user_id,))
+        user = cursor.fetchone()
+        hashed_current = hashlib.sha256(current_password.encode()).hexdigest()
+        if not user or user['password'] != hashed_current:
+            conn.close()
+            return False, "Current password is incorrect"
+        
+        # Update password
+        hashed_new = hashlib.sha256(new_password.encode()).hexdigest()
+        cursor.execute("UPDATE users SET password = ? WHERE id = ?", (hashed_new, user_id))
+        
+        conn.commit()
+        conn.close()
+        return True, "Password changed successfully"
+    except Exception as e:
+        return False, f"Error: {str(e)}"
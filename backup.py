@@ -2,6 +2,10 @@ import json
 import uuid
 from datetime import datetime
 from database import get_db_connection
+from task import add_tasks, BULK_CHUNK_SIZE
+from tags import set_task_tags
+from facets import refresh_facets
+from cache import bump_data_version
 
 def create_backup(user_id):
     try:
@@ -57,39 +61,85 @@ def restore_from_backup(backup_data, user_id):
         if 'tasks' not in backup:
             return False, "Invalid backup format"
         
+        # The whole restore is one transaction: add_tasks below checks out this
+        # same connection (a nested checkout), so its per-chunk commits only
+        # release savepoints and nothing is written unless every task restores
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Begin transaction
-        conn.execute("BEGIN TRANSACTION")
+        new_tasks = []
+        updated = 0
+        task_ids = []
+        task_users = set()
         
-        # Process each task in the backup
-        for task in backup['tasks']:
-            # Check if task already exists
-            cursor.execute("SELECT id FROM tasks WHERE id = ?", (task['id'],))
-            existing_task = cursor.fetchone()
+        for start in range(0, len(backup['tasks']), BULK_CHUNK_SIZE):
+            chunk = backup['tasks'][start:start + BULK_CHUNK_SIZE]
             
-            if existing_task:
-                # Update existing task
-                task_id = task.pop('id')
-                set_clause = ", ".join([f"{key} = ?" for key in task.keys()])
-                query = f"UPDATE tasks SET {set_clause} WHERE id = ?"
-                cursor.execute(query, list(task.values()) + [task_id])
-            else:
-                # Insert new task
-                placeholders = ", ".join(["?"] * len(task))
-                columns = ", ".join(task.keys())
-                query = f"INSERT INTO tasks ({columns}) VALUES ({placeholders})"
-                cursor.execute(query, list(task.values()))
-        
-        # Commit transaction
+            # Check which tasks already exist with one query per chunk
+            placeholders = ", ".join(["?"] * len(chunk))
+            cursor.execute(
+                f"SELECT id, assigned_to, assigned_by FROM tasks WHERE id IN ({placeholders})",
+                [task['id'] for task in chunk]
+            )
+            existing = cursor.fetchall()
+            existing_ids = {row['id'] for row in existing}
+            task_ids.extend(existing_ids)
+            
+            # Previous and restored assignees of overwritten tasks
+            task_users.update(row[key] for row in existing for key in ('assigned_to', 'assigned_by'))
+            task_users.update(
+                task.get(key) for task in chunk if task['id'] in existing_ids
+                for key in ('assigned_to', 'assigned_by')
+            )
+            
+            # Update existing tasks, batched by column set
+            updates = {}
+            for task in chunk:
+                if task['id'] in existing_ids:
+                    columns = tuple(key for key in task.keys() if key != 'id')
+                    updates.setdefault(columns, []).append(
+                        [task[key] for key in columns] + [task['id']]
+                    )
+                else:
+                    # Backups are restored as-is: never turn old rows into new series
+                    new_task = dict(task)
+                    new_task.setdefault('rrule', None)
+                    new_tasks.append(new_task)
+            
+            for columns, rows in updates.items():
+                set_clause = ", ".join([f"{key} = ?" for key in columns])
+                cursor.executemany(f"UPDATE tasks SET {set_clause} WHERE id = ?", rows)
+                if 'tags' in columns:
+                    tags_index = columns.index('tags')
+                    set_task_tags(cursor, [(row[-1], row[tags_index]) for row in rows])
+                updated += len(rows)
+        
+        # Insert new tasks through the bulk API
+        new_ids, errors = add_tasks(new_tasks, user_id=user_id, notify=False)
+        task_ids.extend(new_ids)
+        task_users.update(task.get(key) for task in new_tasks for key in ('assigned_to', 'assigned_by'))
+        
+        if errors:
+            conn.rollback()
+            conn.close()
+            refresh_facets(task_ids)
+            bump_data_version(*task_users)
+            return False, f"Nothing restored: {len(errors)} of {len(backup['tasks'])} tasks failed: {errors[0]['error']}"
+        
         conn.commit()
         conn.close()
         
-        return True, f"Successfully restored {len(backup['tasks'])} tasks"
+        # add_tasks refreshed these before the commit; readers may have cached
+        # the old rows since
+        refresh_facets(task_ids)
+        bump_data_version(*task_users)
+        
+        restored = updated + len([task_id for task_id in new_ids if task_id])
+        return True, f"Successfully restored {restored} tasks"
     except Exception as e:
         # Rollback in case of error
         if 'conn' in locals():
             conn.rollback()
             conn.close()
+            refresh_facets(task_ids)
         return False, f"Error restoring backup: {str(e)}"
@@ -0,0 +1,84 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# Compare substring search through the trigram index with the LIKE scan it
+# replaced, on a throwaway database:
+#     python bench_search.py --tasks 200000 --runs 20
+
+WORDS = ['deploy', 'review', 'report', 'invoice', 'meeting', 'backup', 'release',
+         'customer', 'migration', 'dashboard', 'budget', 'hiring', 'roadmap']
+TAGS = ['ops', 'devops', 'finance', 'hr', 'frontend', 'backend', 'urgent']
+
+def seed(add_tasks, user_id, count):
+    batch = []
+    for i in range(count):
+        batch.append({
+            'title': f"PRJ-{i:06d} {random.choice(WORDS)} {random.choice(WORDS)}",
+            'description': " ".join(random.choice(WORDS) for _ in range(12)),
+            'priority': random.choice(['Low', 'Medium', 'High']),
+            'status': random.choice(['Pending', 'In Progress', 'Completed']),
+            'assigned_to': user_id,
+            'tags': ",".join(random.sample(TAGS, 2))
+        })
+    add_tasks(batch, user_id=user_id, notify=False)
+
+def timed(run, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description="Trigram vs LIKE substring search benchmark")
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    # Point the app at a scratch database before it is imported
+    workdir = tempfile.mkdtemp()
+    os.environ['TASK_MANAGER_DB_PATH'] = os.path.join(workdir, 'bench.db')
+    os.environ['TASK_MANAGER_DB_PROFILE'] = 'bulk-load'
+
+    from database import init_db, get_db_connection
+    from task import add_tasks, get_tasks
+    from search import to_trigram_query
+
+    init_db()
+    conn = get_db_connection()
+    user_id = conn.execute("SELECT id FROM users WHERE username = 'admin'").fetchone()['id']
+    conn.close()
+
+    start = time.perf_counter()
+    seed(add_tasks, user_id, args.tasks)
+    print(f"Seeded {args.tasks} tasks in {time.perf_counter() - start:.1f}s")
+
+    # Ticket code fragments, a word fragment and a tag fragment
+    fragments = [f"{random.randrange(args.tasks):06d}"[1:], "J-0001", "igrat", "evop"]
+
+    print(f"{'fragment':<12}{'LIKE ms':>10}{'trigram ms':>12}{'get_tasks ms':>14}{'matches':>10}")
+    for fragment in fragments:
+        conn = get_db_connection()
+        like_ms, like_rows = timed(lambda: conn.execute(
+            "SELECT id FROM tasks WHERE title LIKE ? OR tags LIKE ?",
+            (f"%{fragment}%", f"%{fragment}%")
+        ).fetchall(), args.runs)
+        trigram_ms, trigram_rows = timed(lambda: conn.execute(
+            "SELECT rowid FROM tasks_trigram WHERE tasks_trigram MATCH ?",
+            (to_trigram_query(fragment),)
+        ).fetchall(), args.runs)
+        conn.close()
+
+        tasks_ms, _ = timed(lambda: get_tasks(user_id, {'search': fragment}), args.runs)
+
+        if len(like_rows) != len(trigram_rows):
+            print(f"  mismatch for {fragment!r}: LIKE {len(like_rows)}, trigram {len(trigram_rows)}")
+        print(f"{fragment:<12}{like_ms:>10.2f}{trigram_ms:>12.2f}{tasks_ms:>14.2f}{len(like_rows):>10}")
+
+if __name__ == '__main__':
+    main()
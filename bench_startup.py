@@ -0,0 +1,84 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# Cold-start import cost of the app entry points, measured with
+# `python -X importtime` in a fresh interpreter per entry point:
+#     python bench_startup.py --budget-ms 1500 --runs 5
+# Exits non-zero when an entry point fails to import, goes over the budget or
+# loads one of the libraries the pages import lazily, so CI can run it.
+
+ENTRY_POINTS = ['main', 'pages', 'app']
+
+# Only the pages that draw tables or charts may import these
+LAZY_MODULES = ['pandas', 'numpy', 'plotly.express', 'altair', 'matplotlib']
+
+# Heaviest direct imports listed per entry point
+TOP_IMPORTS = 8
+
+def import_times(module, env):
+    # {imported module: (cumulative microseconds, nesting depth)} for one
+    # cold import of `module` (depth 0 is the module itself)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            times[name.strip()] = (int(cumulative), depth)
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry point import time budget")
+    parser.add_argument('--budget-ms', type=float, default=1500)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('modules', nargs='*', default=ENTRY_POINTS)
+    args = parser.parse_args()
+
+    # main.py initializes the database on import, so point it at a scratch one
+    env = dict(os.environ)
+    env['TASK_MANAGER_DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'startup.db')
+
+    failures = []
+    for module in args.modules:
+        try:
+            # The fastest run is the least disturbed by the rest of the machine
+            runs = [import_times(module, env) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{module}: import failed: {e}")
+            failures.append(module)
+            continue
+        times = min(runs, key=lambda t: t[module][0])
+
+        total_ms = times[module][0] / 1000
+        eager = [name for name in LAZY_MODULES if name in times]
+        print(f"{module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+        direct = [(cumulative, name) for name, (cumulative, depth) in times.items() if depth == 1]
+        for cumulative, name in sorted(direct, reverse=True)[:TOP_IMPORTS]:
+            print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+
+        if total_ms > args.budget_ms:
+            failures.append(module)
+        if eager:
+            print(f"    loads lazy modules at import: {', '.join(eager)}")
+            failures.append(module)
+
+    if failures:
+        print(f"Failed: {', '.join(sorted(set(failures)))}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from database import STORAGE_CONFIG
+
+# Process-wide cache for the read functions every Streamlit rerun calls.
+# Entries are tagged with the per-user data version at the time they were
+# computed; the mutators bump the versions of the users a write touches, so a
+# rerun without data changes is answered without touching the database.
+# Like the facet index, versions only see writes made by this process.
+# Configured by the cache_ttl and cache_max_entries storage settings
+# (TASK_MANAGER_DB_CACHE_TTL=0 turns the cache off).
+# Cached results are shared between callers without copying: treat them as
+# read-only (the pages only read them or build DataFrames from them).
+
+class QueryCache:
+    def __init__(self, ttl=STORAGE_CONFIG['cache_ttl'], max_entries=STORAGE_CONFIG['cache_max_entries']):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        # Unscoped reads (user_id None) see every user's data
+        self._global_version = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'expired': 0,
+            'evicted': 0
+        }
+
+    def version(self, user_id):
+        if user_id is None:
+            return self._global_version
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_ids):
+        with self._lock:
+            self._global_version += 1
+            for user_id in set(user_ids):
+                if user_id is not None:
+                    self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def get(self, key, user_id):
+        # (found, value); entries from an older data version are dropped
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return False, None
+            version, expires_at, value = entry
+            if version != self.version(user_id):
+                self.stats['stale'] += 1
+                self.stats['misses'] += 1
+                del self._entries[key]
+                return False, None
+            if expires_at < time.monotonic():
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+        return True, value
+
+    def put(self, key, version, value):
+        # `version` is read before the query ran, so a write that lands while
+        # it runs leaves the entry already stale
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evicted'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['ttl'] = self.ttl
+        stats['max_entries'] = self.max_entries
+        return stats
+
+_cache = QueryCache()
+
+# Set by a reader that caught an error and is returning its fallback, so the
+# cached call running on this thread doesn't store it
+_failures = threading.local()
+
+def skip_cache():
+    _failures.failed = True
+
+def _freeze(value):
+    # Filters arrive as dicts/lists; cache keys must be hashable
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def cached(func):
+    # For read functions whose first argument is the user id. Results also
+    # depend on today's date (overdue, due today), so the date is in the key.
+    @functools.wraps(func)
+    def wrapper(user_id=None, *args, **kwargs):
+        if _cache.ttl <= 0:
+            return func(user_id, *args, **kwargs)
+        key = (func.__module__, func.__name__, user_id, _freeze(args), _freeze(kwargs), date.today())
+        found, value = _cache.get(key, user_id)
+        if found:
+            return value
+        version = _cache.version(user_id)
+        # An enclosing cached call fails too when this one does
+        outer_failed = getattr(_failures, 'failed', False)
+        _failures.failed = False
+        value = func(user_id, *args, **kwargs)
+        failed = _failures.failed
+        _failures.failed = outer_failed or failed
+        if not failed:
+            _cache.put(key, version, value)
+        return value
+    wrapper.uncached = func
+    return wrapper
+
+def bump_data_version(*user_ids):
+    _cache.bump(user_ids)
+
+def get_data_version(user_id=None):
+    # Changes whenever a write touches the user's data, for callers keeping
+    # their own copy of a result (e.g. a DataFrame in session state)
+    return _cache.version(user_id)
+
+def configure_cache(ttl=None, max_entries=None):
+    if ttl is not None:
+        _cache.ttl = ttl
+    if max_entries is not None:
+        _cache.max_entries = max_entries
+    _cache.clear()
+
+def clear_cache():
+    _cache.clear()
+
+def get_cache_stats():
+    return _cache.get_stats()
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import uuid
+from datetime import date, timedelta
+
+# Upgrade a database in the original (pre-migration) schema and check that
+# the tasks users see do not change:
+#     python check_upgrade.py
+# Exits non-zero on a mismatch, so CI can run it.
+
+# Tables as the first release created them
+BASELINE_SCHEMA = [
+    '''
+    CREATE TABLE users (
+        id TEXT PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        email TEXT UNIQUE,
+        created_at TEXT NOT NULL,
+        last_login TEXT,
+        theme TEXT DEFAULT 'light'
+    )
+    ''',
+    '''
+    CREATE TABLE tasks (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        priority TEXT NOT NULL,
+        status TEXT NOT NULL,
+        due_date TEXT,
+        created_date TEXT NOT NULL,
+        modified_date TEXT NOT NULL,
+        assigned_by TEXT,
+        assigned_to TEXT NOT NULL,
+        tags TEXT,
+        recurring TEXT,
+        recurrence_end_date TEXT,
+        reminder TEXT,
+        time_estimate INTEGER,
+        time_spent INTEGER DEFAULT 0,
+        notes TEXT,
+        FOREIGN KEY (assigned_to) REFERENCES users (id)
+    )
+    '''
+]
+
+def legacy_series(title, start, recurring, copies, step):
+    # A recurring task and the copies the old create_recurring_tasks stored
+    # for it: "<title> (n)" due n - 1 periods after the original
+    rows = [(title, start, recurring)]
+    for n in range(2, copies + 2):
+        rows.append((f"{title} ({n})", start + step * (n - 1), recurring))
+    return rows
+
+def seed(path, user_id):
+    start = date.today() - timedelta(days=40)
+    rows = (
+        legacy_series("Standup", start, 'Daily', 30, timedelta(days=1))
+        # A copy that was deleted, and a copy of a copy
+        + [row for row in legacy_series("Review", start, 'Weekly', 12, timedelta(weeks=1)) if row[0] != "Review (5)"]
+        + [("Review (2) (2)", start + timedelta(weeks=2), 'Weekly')]
+        # An original whose copies are all gone
+        + [("Report", start, 'Monthly')]
+        + [("One-off", start, 'None')]
+    )
+    conn = sqlite3.connect(path)
+    for statement in BASELINE_SCHEMA:
+        conn.execute(statement)
+    now = f"{start} 09:00:00"
+    conn.execute(
+        "INSERT INTO users (id, username, password, email, created_at) VALUES (?, ?, ?, ?, ?)",
+        (user_id, 'legacy', 'x', 'legacy@example.com', now)
+    )
+    conn.executemany('''
+    INSERT INTO tasks (id, title, priority, status, due_date, created_date, modified_date,
+                       assigned_by, assigned_to, tags, recurring)
+    VALUES (?, ?, 'Medium', 'Pending', ?, ?, ?, ?, ?, '', ?)
+    ''', [
+        (str(uuid.uuid4()), title, due.isoformat(), now, now, user_id, user_id, recurring)
+        for title, due, recurring in rows
+    ])
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+def main():
+    # Point the app at a scratch database before it is imported
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, 'upgrade.db')
+    os.environ['TASK_MANAGER_DB_PATH'] = path
+    os.environ['TASK_MANAGER_DB_CACHE_TTL'] = '0'
+
+    user_id = str(uuid.uuid4())
+    stored = seed(path, user_id)
+
+    from database import init_db
+    from task import count_tasks, get_tasks, get_task_statistics
+
+    init_db()
+
+    results = {
+        'count_tasks': count_tasks(user_id),
+        'get_tasks': len(get_tasks(user_id)),
+        'statistics total': get_task_statistics(user_id).get('total')
+    }
+    failed = False
+    for name, value in results.items():
+        status = "ok" if value == stored else "MISMATCH"
+        failed = failed or value != stored
+        print(f"{name:<18}{value:>6}  (stored rows {stored})  {status}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import streamlit as st
+from database import get_db_connection
+from cache import skip_cache
+from migrations import COUNTER_BACKFILL_SQL, ROLLUP_BACKFILL_SQL
+
+def get_task_counters(user_id):
+    # O(statuses x priorities) lookup of the trigger-maintained counters
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        SELECT status, priority, task_count, time_spent, time_estimate
+        FROM task_counters
+        WHERE user_id = ? AND task_count != 0
+        """, (user_id,))
+        rows = [dict(row) for row in cursor.fetchall()]
+        
+        conn.close()
+        return rows
+    except Exception as e:
+        st.error(f"Error fetching task counters: {str(e)}")
+        skip_cache()
+        return []
+
+def rebuild_task_counters():
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM task_counters")
+        cursor.execute(COUNTER_BACKFILL_SQL)
+        
+        conn.commit()
+        conn.close()
+        return True, "Task counters rebuilt successfully"
+    except Exception as e:
+        return False, f"Error rebuilding task counters: {str(e)}"
+
+def check_task_counters(repair=False):
+    # Compare the counters with a fresh aggregate of the tasks table and
+    # return every (user_id, status, priority) that disagrees
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        WITH expected AS (
+            SELECT user_id, status, priority,
+                   COUNT(*) AS task_count,
+                   SUM(IFNULL(time_spent, 0)) AS time_spent,
+                   SUM(IFNULL(time_estimate, 0)) AS time_estimate
+            FROM (
+                SELECT assigned_to AS user_id, status, priority, time_spent, time_estimate FROM tasks
+                UNION ALL
+                SELECT assigned_by AS user_id, status, priority, time_spent, time_estimate FROM tasks
+                WHERE assigned_by IS NOT NULL AND assigned_by != assigned_to
+            )
+            GROUP BY user_id, status, priority
+        ),
+        actual AS (
+            SELECT user_id, status, priority, task_count, time_spent, time_estimate
+            FROM task_counters
+            WHERE task_count != 0 OR time_spent != 0 OR time_estimate != 0
+        )
+        SELECT * FROM (SELECT * FROM expected EXCEPT SELECT * FROM actual)
+        UNION
+        SELECT * FROM (SELECT * FROM actual EXCEPT SELECT * FROM expected)
+        """)
+        mismatches = [dict(row) for row in cursor.fetchall()]
+        
+        conn.close()
+        
+        if mismatches and repair:
+            rebuild_task_counters()
+        
+        return mismatches
+    except Exception as e:
+        st.error(f"Error checking task counters: {str(e)}")
+        return []
+
+def get_daily_rollup(user_id, start_day, end_day):
+    # Bounded range read of the daily rollup; days without activity are omitted
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        SELECT day, created, completed, overdue
+        FROM task_daily_rollup
+        WHERE user_id = ? AND day >= ? AND day <= ?
+          AND (created != 0 OR completed != 0 OR overdue != 0)
+        ORDER BY day
+        """, (user_id, start_day, end_day))
+        rows = [dict(row) for row in cursor.fetchall()]
+        
+        conn.close()
+        return rows
+    except Exception as e:
+        st.error(f"Error fetching task trend: {str(e)}")
+        skip_cache()
+        return []
+
+def rebuild_daily_rollup():
+    # One-shot batch backfill, e.g. after importing tasks with triggers disabled
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM task_daily_rollup")
+        cursor.execute(ROLLUP_BACKFILL_SQL)
+        
+        conn.commit()
+        conn.close()
+        return True, "Daily rollup rebuilt successfully"
+    except Exception as e:
+        return False, f"Error rebuilding daily rollup: {str(e)}"
@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from task import get_task_statistics, get_due_timeline
+from notification import get_notifications
+
+# Tasks listed per Task Timeline widget and unread notifications shown
+TIMELINE_TASKS = 10
+DASHBOARD_NOTIFICATIONS = 5
+
+# Dashboard queries run side by side: one on the calling (script) thread, the
+# others on worker threads started for the call, so sessions never queue
+# behind each other for workers. Each worker thread takes its own pooled
+# connection, so the reads overlap under WAL.
+DASHBOARD_WORKERS = 2
+
+class DashboardData(NamedTuple):
+    stats: dict
+    due_today: list
+    more_today: bool
+    overdue: list
+    more_overdue: bool
+    due_this_week: list
+    more_this_week: bool
+    notifications: list
+
+def _in_session(ctx, func, *args, **kwargs):
+    # Attach the caller's Streamlit context so st.error in a loader still
+    # reaches the page instead of being dropped by the worker thread
+    if ctx is not None:
+        add_script_run_ctx(threading.current_thread(), ctx)
+    return func(*args, **kwargs)
+
+def load_dashboard(user_id):
+    # Everything dashboard_page renders, from three concurrent reads:
+    # the statistics (counters and daily rollup), the due date timeline
+    # and the latest unread notifications
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix="dashboard") as executor:
+        timeline = executor.submit(_in_session, ctx, get_due_timeline, user_id, TIMELINE_TASKS)
+        notifications = executor.submit(_in_session, ctx, get_notifications, user_id, True, DASHBOARD_NOTIFICATIONS)
+        stats = get_task_statistics(user_id)
+        timeline = timeline.result()
+        notifications = notifications.result()
+
+    return DashboardData(
+        stats=stats,
+        due_today=timeline['today'][0],
+        more_today=timeline['today'][1],
+        overdue=timeline['overdue'][0],
+        more_overdue=timeline['overdue'][1],
+        due_this_week=timeline['week'][0],
+        more_this_week=timeline['week'][1],
+        notifications=notifications
+    )
@@ -1,12 +1,258 @@
 import sqlite3
+import threading
 import uuid
 import hashlib
+from contextlib import contextmanager
 from datetime import datetime
+from migrations import apply_migrations
+from storage import load_storage_config, validate_storage_config, apply_pragmas, PROFILES, PRAGMA_KEYS
+
+STORAGE_CONFIG = load_storage_config()
+DB_PATH = STORAGE_CONFIG['db_path']
+POOL_SIZE = STORAGE_CONFIG['pool_size']
+
+class PooledConnection:
+    # Thin wrapper around sqlite3.Connection so existing `conn.close()` calls
+    # hand the connection back to the pool instead of closing it. A nested
+    # checkout (the thread already holds a connection) works inside its own
+    # savepoint, so its commit()/rollback() never ends the caller's transaction.
+    def __init__(self, pool, lease, savepoint=None):
+        self._pool = pool
+        self._lease = lease
+        self._conn = lease.conn
+        self._savepoint = savepoint
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        self.close()
+        return False
+
+    def commit(self):
+        if self._savepoint is None:
+            self._conn.commit()
+            return
+        # Hand the work to the enclosing transaction and keep a savepoint for
+        # whatever this checkout does next
+        self._conn.execute(f"RELEASE SAVEPOINT {self._savepoint}")
+        self._conn.execute(f"SAVEPOINT {self._savepoint}")
+
+    def rollback(self):
+        if self._savepoint is None:
+            self._conn.rollback()
+        else:
+            self._conn.execute(f"ROLLBACK TO SAVEPOINT {self._savepoint}")
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._lease, self._savepoint)
+
+    def __del__(self):
+        # Error paths that never call close() still give the connection back
+        # (rolling back whatever they left uncommitted), whichever thread
+        # collects the wrapper
+        try:
+            self.close()
+        except Exception:
+            pass
+
+class Lease:
+    # One thread's checkout of a pooled connection, shared by its nested checkouts
+    def __init__(self, conn):
+        self.conn = conn
+        self.thread = threading.current_thread()
+        self.depth = 1
+        self.savepoints = 0
+
+class ConnectionPool:
+    def __init__(self, database=DB_PATH, max_size=POOL_SIZE, health_check=True, config=None):
+        self.database = database
+        self.max_size = max_size
+        self.health_check = health_check
+        self.config = config or STORAGE_CONFIG
+        self._idle = []
+        self._lock = threading.Lock()
+        # Thread id -> Lease of the connection that thread holds
+        self._leases = {}
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'health_check_failures': 0,
+            'discarded': 0
+        }
+
+    def _connect(self):
+        # Connections move between Streamlit script threads, but only one
+        # thread holds a given connection at a time
+        conn = sqlite3.connect(
+            self.database,
+            timeout=self.config['busy_timeout'] / 1000,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn, self.config)
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        # Nested calls on the same thread share the connection already held
+        thread = threading.current_thread()
+        with self._lock:
+            lease = self._leases.get(thread.ident)
+            # A lease left by a finished thread whose id was reused is not ours
+            if lease is not None and lease.thread is thread:
+                lease.depth += 1
+                lease.savepoints += 1
+                savepoint = f"nested_{lease.savepoints}"
+                self.stats['hits'] += 1
+            else:
+                lease = None
+        if lease is not None:
+            lease.conn.execute(f"SAVEPOINT {savepoint}")
+            return PooledConnection(self, lease, savepoint)
+
+        conn = None
+        while True:
+            with self._lock:
+                if not self._idle:
+                    self.stats['misses'] += 1
+                    break
+                candidate = self._idle.pop()
+            if not self.health_check or self._is_healthy(candidate):
+                conn = candidate
+                with self._lock:
+                    self.stats['hits'] += 1
+                break
+            with self._lock:
+                self.stats['health_check_failures'] += 1
+            candidate.close()
+
+        if conn is None:
+            conn = self._connect()
+
+        lease = Lease(conn)
+        with self._lock:
+            self._leases[thread.ident] = lease
+        return PooledConnection(self, lease)
+
+    def release(self, lease, savepoint=None):
+        # May run on any thread (wrappers are also closed by the garbage
+        # collector), so the lease is found from the wrapper, not the caller
+        with self._lock:
+            if lease.depth == 0:
+                return
+            lease.depth -= 1
+            last = lease.depth == 0
+            if last and self._leases.get(lease.thread.ident) is lease:
+                del self._leases[lease.thread.ident]
+
+        conn = lease.conn
+        if not last:
+            # Undo what the nested checkout left uncommitted. The savepoint is
+            # already gone if the caller committed or released an outer one.
+            if savepoint is not None:
+                try:
+                    conn.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                    conn.execute(f"RELEASE SAVEPOINT {savepoint}")
+                except sqlite3.Error:
+                    pass
+            return
+
+        # Never hand a connection with a half-finished transaction to the next user
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(conn)
+                return
+            self.stats['discarded'] += 1
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['idle'] = len(self._idle)
+        stats['max_size'] = self.max_size
+        stats['database'] = self.database
+        stats['journal_mode'] = self.config['journal_mode']
+        return stats
+
+_pool = ConnectionPool()
+
+def configure_pool(database=None, max_size=None, health_check=None, profile=None, **pragmas):
+    # Swap the shared pool, e.g. to switch to the "bulk-load" profile for an import
+    global _pool
+    old_pool = _pool
+    config = dict(old_pool.config)
+    if profile is not None:
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown storage profile: {profile}")
+        config.update(PROFILES[profile])
+        config['profile'] = profile
+    # The values end up in PRAGMA statements, so they get the same checks as
+    # the storage config
+    unknown = sorted(set(pragmas) - set(PRAGMA_KEYS))
+    if unknown:
+        raise ValueError(f"Unknown PRAGMA settings: {', '.join(unknown)}")
+    config.update(pragmas)
+    config = validate_storage_config(config)
+    _pool = ConnectionPool(
+        database if database is not None else old_pool.database,
+        max_size if max_size is not None else old_pool.max_size,
+        health_check if health_check is not None else old_pool.health_check,
+        config
+    )
+    old_pool.close_all()
+    return _pool
+
+def get_pool_stats():
+    return _pool.get_stats()
 
 def get_db_connection():
-    conn = sqlite3.connect('task_manager.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    return _pool.acquire()
+
+def db_connection():
+    # Commits on success, rolls back on error and returns the connection to the pool
+    return _pool.connection()
 
 def init_db():
     conn = get_db_connection()
@@ -99,4 +345,8 @@ def init_db():
         )
     
     conn.commit()
+    
+    # Upgrade existing databases in place (indexes, new tables and columns)
+    apply_migrations(conn)
+    
     conn.close()
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+import streamlit as st
+from database import get_db_connection
+
+# Users matched per directory search and remembered per session
+USER_MATCHES = 10
+RECENT_USERS = 5
+
+def search_users(prefix, limit=USER_MATCHES):
+    # Users whose username or email starts with `prefix` (any case), by
+    # username. Each arm walks its NOCASE index and stops after `limit` rows,
+    # so short prefixes cost the same as long ones; an empty prefix matches
+    # nobody rather than listing the whole table.
+    prefix = (prefix or "").strip()
+    if not prefix:
+        return []
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        pattern = f"{escaped}%"
+        cursor.execute('''
+        SELECT * FROM (
+            SELECT id, username, email FROM users
+            WHERE username LIKE ? ESCAPE '\\'
+            ORDER BY username COLLATE NOCASE LIMIT ?
+        )
+        UNION
+        SELECT * FROM (
+            SELECT id, username, email FROM users
+            WHERE email LIKE ? ESCAPE '\\'
+            ORDER BY email COLLATE NOCASE LIMIT ?
+        )
+        ORDER BY username COLLATE NOCASE
+        LIMIT ?
+        ''', (pattern, limit, pattern, limit, limit))
+        users = [dict(row) for row in cursor.fetchall()]
+        
+        conn.close()
+        return users
+    except Exception as e:
+        st.error(f"Error searching users: {str(e)}")
+        return []
+
+def get_user_names(user_ids):
+    # id -> username for the given users (primary key lookups)
+    user_ids = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+    if not user_ids:
+        return {}
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        placeholders = ", ".join(["?"] * len(user_ids))
+        cursor.execute(f"SELECT id, username FROM users WHERE id IN ({placeholders})", user_ids)
+        user_names = {row['id']: row['username'] for row in cursor.fetchall()}
+        
+        conn.close()
+        return user_names
+    except Exception as e:
+        st.error(f"Error fetching users: {str(e)}")
+        return {}
+
+def remember_user(user_id, username):
+    # Per-session LRU of the users picked last, most recent first
+    recent = st.session_state.setdefault('recent_users', OrderedDict())
+    recent[user_id] = username
+    recent.move_to_end(user_id, last=False)
+    while len(recent) > RECENT_USERS:
+        recent.popitem()
+
+def recent_users():
+    return dict(st.session_state.get('recent_users', {}))
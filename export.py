@@ -1,8 +1,10 @@
 import json
-import pandas as pd
 import streamlit as st
 
 def export_tasks_to_csv(tasks):
+    # pandas is only loaded when an export is requested
+    import pandas as pd
+    
     try:
         df = pd.DataFrame(tasks)
         csv = df.to_csv(index=False)
@@ -0,0 +1,212 @@
+import threading
+from database import get_db_connection, STORAGE_CONFIG
+from tags import parse_tags
+
+# Optional in-process facet index for View Tasks (storage config "facet_index",
+# env TASK_MANAGER_DB_FACET_INDEX=1). Every facet value owns a bitmap over the
+# tasks rowids, so any filter combination is a few ANDs/ORs of Python ints and
+# facet counts are popcounts. The index lives in this process: it is built
+# lazily from the tasks table and kept current by the task functions, so it
+# only suits deployments where one server process writes the database.
+
+FACETS = ['status', 'priority', 'assigned_to', 'tags']
+
+# Rowids are split into 65536-bit chunks and only non-empty chunks are stored,
+# so sparse values (most tags and assignees) stay small
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+# Rows read per query when building or refreshing the index
+LOAD_CHUNK_SIZE = 500
+
+class Bitmap:
+    def __init__(self, chunks=None):
+        self.chunks = chunks or {}
+
+    def add(self, rowid):
+        key = rowid >> CHUNK_BITS
+        self.chunks[key] = self.chunks.get(key, 0) | (1 << (rowid & CHUNK_MASK))
+
+    def discard(self, rowid):
+        key = rowid >> CHUNK_BITS
+        if key in self.chunks:
+            bits = self.chunks[key] & ~(1 << (rowid & CHUNK_MASK))
+            if bits:
+                self.chunks[key] = bits
+            else:
+                del self.chunks[key]
+
+    def __and__(self, other):
+        chunks = {}
+        for key in self.chunks.keys() & other.chunks.keys():
+            bits = self.chunks[key] & other.chunks[key]
+            if bits:
+                chunks[key] = bits
+        return Bitmap(chunks)
+
+    def __or__(self, other):
+        chunks = dict(self.chunks)
+        for key, bits in other.chunks.items():
+            chunks[key] = chunks.get(key, 0) | bits
+        return Bitmap(chunks)
+
+    def __len__(self):
+        return sum(bits.bit_count() for bits in self.chunks.values())
+
+    def __iter__(self):
+        for key in sorted(self.chunks):
+            bits = self.chunks[key]
+            while bits:
+                low = bits & -bits
+                yield (key << CHUNK_BITS) | (low.bit_length() - 1)
+                bits ^= low
+
+class FacetIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._bitmaps = {facet: {} for facet in FACETS}
+        # Tasks visible to a user: assigned to or by them (the get_tasks scope)
+        self._visible = {}
+        self._all = Bitmap()
+        self._rowids = {}
+        self._task_ids = {}
+        self._tag_names = {}
+
+    def _load(self, cursor, task_ids=None):
+        # Yield (rowid, task_id, status, priority, assigned_to, assigned_by, tags)
+        if task_ids is None:
+            cursor.execute("SELECT rowid, id, status, priority, assigned_to, assigned_by FROM tasks")
+            rows = cursor.fetchall()
+            cursor.execute("SELECT task_tags.task_id, tags.name FROM task_tags JOIN tags ON tags.id = task_tags.tag_id")
+            tag_rows = cursor.fetchall()
+        else:
+            rows, tag_rows = [], []
+            for start in range(0, len(task_ids), LOAD_CHUNK_SIZE):
+                chunk = task_ids[start:start + LOAD_CHUNK_SIZE]
+                placeholders = ", ".join(["?"] * len(chunk))
+                cursor.execute(f"""
+                SELECT rowid, id, status, priority, assigned_to, assigned_by FROM tasks
+                WHERE id IN ({placeholders})
+                """, chunk)
+                rows.extend(cursor.fetchall())
+                cursor.execute(f"""
+                SELECT task_tags.task_id, tags.name FROM task_tags
+                JOIN tags ON tags.id = task_tags.tag_id
+                WHERE task_tags.task_id IN ({placeholders})
+                """, chunk)
+                tag_rows.extend(cursor.fetchall())
+        
+        tags = {}
+        for task_id, name in tag_rows:
+            tags.setdefault(task_id, []).append(name)
+        
+        for rowid, task_id, status, priority, assigned_to, assigned_by in rows:
+            yield rowid, task_id, status, priority, assigned_to, assigned_by, tags.get(task_id, [])
+
+    def _add(self, rowid, task_id, status, priority, assigned_to, assigned_by, tags):
+        # Tags are matched case-insensitively but reported with their own spelling
+        for name in tags:
+            self._tag_names[name.lower()] = name
+        values = {'status': [status], 'priority': [priority], 'assigned_to': [assigned_to], 'tags': [name.lower() for name in tags]}
+        for facet, facet_values in values.items():
+            for value in facet_values:
+                self._bitmaps[facet].setdefault(value, Bitmap()).add(rowid)
+        for user_id in {assigned_to, assigned_by}:
+            if user_id:
+                self._visible.setdefault(user_id, Bitmap()).add(rowid)
+        self._all.add(rowid)
+        self._rowids[task_id] = rowid
+        self._task_ids[rowid] = task_id
+
+    def _remove(self, task_id):
+        # Old facet values are unknown, so clear the bit everywhere
+        rowid = self._rowids.pop(task_id, None)
+        if rowid is None:
+            return
+        del self._task_ids[rowid]
+        self._all.discard(rowid)
+        for bitmaps in list(self._bitmaps.values()) + [self._visible]:
+            for bitmap in bitmaps.values():
+                bitmap.discard(rowid)
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        conn = get_db_connection()
+        for row in self._load(conn.cursor()):
+            self._add(*row)
+        conn.close()
+        self._built = True
+
+    def refresh(self, task_ids):
+        # Hook for the task functions: re-read the given tasks after a commit
+        task_ids = [task_id for task_id in task_ids if task_id]
+        with self._lock:
+            if not self._built or not task_ids:
+                return
+            conn = get_db_connection()
+            rows = list(self._load(conn.cursor(), task_ids))
+            conn.close()
+            for task_id in task_ids:
+                self._remove(task_id)
+            for row in rows:
+                self._add(*row)
+
+    def _match(self, user_id, filters, skip=None):
+        result = self._visible.get(user_id, Bitmap()) if user_id else self._all
+        for facet in ['status', 'priority', 'assigned_to']:
+            if facet != skip and facet in filters:
+                result = result & self._bitmaps[facet].get(filters[facet], Bitmap())
+        
+        if skip != 'tags' and filters.get('tags'):
+            bitmaps = [self._bitmaps['tags'].get(name.lower(), Bitmap()) for name in parse_tags(filters['tags'])]
+            if bitmaps:
+                combined = bitmaps[0]
+                for bitmap in bitmaps[1:]:
+                    combined = combined & bitmap if filters.get('tag_match') == 'all' else combined | bitmap
+                result = result & combined
+        return result
+
+    def counts(self, user_id=None, filters=None, restrict=None):
+        # {facet: {value: matching tasks}} plus the 'total' of matching tasks;
+        # each facet ignores its own filter so the counts say what picking
+        # another value of that facet would return
+        filters = filters or {}
+        with self._lock:
+            self._ensure_built()
+            matching = self._match(user_id, filters)
+            counts = {'total': len(matching & restrict if restrict is not None else matching)}
+            for facet in FACETS:
+                base = self._match(user_id, filters, skip=facet)
+                if restrict is not None:
+                    base = base & restrict
+                counts[facet] = {}
+                for value, bitmap in self._bitmaps[facet].items():
+                    count = len(base & bitmap)
+                    if count:
+                        counts[facet][self._tag_names.get(value, value) if facet == 'tags' else value] = count
+            return counts
+
+_facet_index = None
+_facet_index_lock = threading.Lock()
+
+def get_facet_index():
+    # None when the facet index is disabled in the storage config
+    global _facet_index
+    if not STORAGE_CONFIG['facet_index']:
+        return None
+    with _facet_index_lock:
+        if _facet_index is None:
+            _facet_index = FacetIndex()
+    return _facet_index
+
+def refresh_facets(task_ids):
+    if _facet_index is not None:
+        _facet_index.refresh(list(task_ids))
+
+def rowid_bitmap(rowids):
+    bitmap = Bitmap()
+    for rowid in rowids:
+        bitmap.add(rowid)
+    return bitmap
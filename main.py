@@ -1,32 +1,35 @@
 import streamlit as st
-from datetime import datetime
-from streamlit_option_menu import option_menu
 
-# Importing functions from other modules
+# Only what the entry point itself uses; the pages import their own
+# dependencies (and the heavy ones lazily). Each route imports its page, so
+# a page that fails to import breaks only its own menu entry.
 from database import init_db
-from auth import login_user, logout_user, register_user
-from task import add_task, get_tasks, update_task, delete_task, get_task_statistics
-from notification import get_notifications, mark_notification_as_read, mark_all_notifications_as_read
-from backup import create_backup, restore_from_backup
-from export import export_tasks_to_csv, export_tasks_to_json
-from settings import get_user_settings, update_user_settings
-from pages import login_page, dashboard_page, add_task_page, view_tasks_page, statistics_page, settings_page, notifications_page
+from auth import logout_user
+from notification import get_unread_count
+from reminders import start_reminder_scheduler
 
-# Initialize database
+def load_css(file_name):
+    with open(file_name, 'r') as f:
+        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+
+# Initialize database and start firing task reminders (once per process)
 init_db()
+start_reminder_scheduler()
 
 # Main application logic
 def main():
     st.set_page_config(page_title="Advanced Task Manager", layout="wide")
     
     # Load CSS
-    load_css("styles.css")
+    load_css("style.css")
     
     # Check if user is logged in
     if "logged_in" not in st.session_state or not st.session_state.logged_in:
+        from pages import login_page
         login_page()
     else:
-        # Sidebar menu
+        # Sidebar menu (not needed on the login page)
+        from streamlit_option_menu import option_menu
         with st.sidebar:
             selected = option_menu(
                 "Menu",
@@ -35,19 +38,30 @@ def main():
                 menu_icon="cast",
                 default_index=0
             )
+            
+            # Unread badge: a counter lookup, not a scan of the notifications
+            unread_count = get_unread_count(st.session_state.user_id)
+            if unread_count:
+                st.info(f"Unread notifications: {unread_count}")
         
         # Page routing
         if selected == "Dashboard":
+            from pages import dashboard_page
             dashboard_page()
         elif selected == "View Tasks":
+            from pages import view_tasks_page
             view_tasks_page()
         elif selected == "Add Task":
+            from pages import add_task_page
             add_task_page()
         elif selected == "Statistics":
+            from pages import statistics_page
             statistics_page()
         elif selected == "Settings":
+            from pages import settings_page
             settings_page()
         elif selected == "Notifications":
+            from pages import notifications_page
             notifications_page()
         elif selected == "Logout":
             logout_user()
@@ -0,0 +1,714 @@
+import itertools
+import re
+from datetime import datetime, timedelta
+from recurrence import FREQUENCIES, nth_occurrence_date, occurrence_dates
+
+# Per-user task counters: every task counts once for its assignee and once for
+# its assigner when that is a different user (the scope used by get_tasks)
+def _counter_upsert(row, sign):
+    values = f"""
+        {sign}1, {sign}IFNULL({row}.time_spent, 0), {sign}IFNULL({row}.time_estimate, 0)
+    """
+    upsert = """
+        ON CONFLICT (user_id, status, priority) DO UPDATE SET
+            task_count = task_count + excluded.task_count,
+            time_spent = time_spent + excluded.time_spent,
+            time_estimate = time_estimate + excluded.time_estimate;
+    """
+    return f"""
+        INSERT INTO task_counters (user_id, status, priority, task_count, time_spent, time_estimate)
+        VALUES ({row}.assigned_to, {row}.status, {row}.priority, {values})
+        {upsert}
+        INSERT INTO task_counters (user_id, status, priority, task_count, time_spent, time_estimate)
+        SELECT {row}.assigned_by, {row}.status, {row}.priority, {values}
+        WHERE {row}.assigned_by IS NOT NULL AND {row}.assigned_by != {row}.assigned_to
+        {upsert}
+    """
+
+COUNTER_BACKFILL_SQL = '''
+INSERT INTO task_counters (user_id, status, priority, task_count, time_spent, time_estimate)
+SELECT user_id, status, priority, COUNT(*), SUM(IFNULL(time_spent, 0)), SUM(IFNULL(time_estimate, 0))
+FROM (
+    SELECT assigned_to AS user_id, status, priority, time_spent, time_estimate FROM tasks
+    UNION ALL
+    SELECT assigned_by AS user_id, status, priority, time_spent, time_estimate FROM tasks
+    WHERE assigned_by IS NOT NULL AND assigned_by != assigned_to
+)
+GROUP BY user_id, status, priority
+'''
+
+# Daily rollup per user and day: tasks created that day, tasks completed that
+# day and tasks due that day that are still open (for past days: overdue)
+def _rollup_upsert(row, sign):
+    statements = []
+    buckets = [
+        ("created", f"substr({row}.created_date, 1, 10)", "1"),
+        ("completed", f"substr(IFNULL({row}.completed_date, {row}.modified_date), 1, 10)",
+         f"{row}.status = 'Completed'"),
+        ("overdue", f"{row}.due_date",
+         f"{row}.status != 'Completed' AND {row}.due_date IS NOT NULL AND {row}.due_date != ''")
+    ]
+    users = [
+        (f"{row}.assigned_to", "1"),
+        (f"{row}.assigned_by", f"{row}.assigned_by IS NOT NULL AND {row}.assigned_by != {row}.assigned_to")
+    ]
+    for column, day, bucket_condition in buckets:
+        values = {name: "0" for name, _, _ in buckets}
+        values[column] = f"{sign}1"
+        for user, user_condition in users:
+            statements.append(f"""
+        INSERT INTO task_daily_rollup (user_id, day, created, completed, overdue)
+        SELECT {user}, {day}, {values['created']}, {values['completed']}, {values['overdue']}
+        WHERE {bucket_condition} AND {user_condition}
+        ON CONFLICT (user_id, day) DO UPDATE SET
+            created = created + excluded.created,
+            completed = completed + excluded.completed,
+            overdue = overdue + excluded.overdue;
+            """)
+    return "".join(statements)
+
+ROLLUP_BACKFILL_SQL = '''
+WITH task_users AS (
+    SELECT assigned_to AS user_id, * FROM tasks
+    UNION ALL
+    SELECT assigned_by AS user_id, * FROM tasks
+    WHERE assigned_by IS NOT NULL AND assigned_by != assigned_to
+)
+INSERT INTO task_daily_rollup (user_id, day, created, completed, overdue)
+SELECT user_id, day, SUM(created), SUM(completed), SUM(overdue)
+FROM (
+    SELECT user_id, substr(created_date, 1, 10) AS day, 1 AS created, 0 AS completed, 0 AS overdue
+    FROM task_users
+    UNION ALL
+    SELECT user_id, substr(IFNULL(completed_date, modified_date), 1, 10), 0, 1, 0
+    FROM task_users WHERE status = 'Completed'
+    UNION ALL
+    SELECT user_id, due_date, 0, 0, 1
+    FROM task_users WHERE status != 'Completed' AND due_date IS NOT NULL AND due_date != ''
+)
+GROUP BY user_id, day
+'''
+
+# The search indexes are kept in sync with the tasks table; deleting from an
+# external content index means replaying the old values with 'delete'
+FTS_COLUMNS = ["title", "description", "notes", "tags"]
+
+def _fts_insert(row, table="tasks_fts", columns=FTS_COLUMNS):
+    return f"""
+        INSERT INTO {table} (rowid, {", ".join(columns)})
+        VALUES ({row}.rowid, {", ".join(f"{row}.{column}" for column in columns)});
+    """
+
+def _fts_delete(row, table="tasks_fts", columns=FTS_COLUMNS):
+    return f"""
+        INSERT INTO {table} ({table}, rowid, {", ".join(columns)})
+        VALUES ('delete', {row}.rowid, {", ".join(f"{row}.{column}" for column in columns)});
+    """
+
+# Split the comma-separated tasks.tags column into (task_id, tag) rows. Tag
+# names are trimmed and matched case-insensitively (tags.name is NOCASE).
+TAG_BACKFILL_SQL = [
+    '''
+    CREATE TEMP TABLE IF NOT EXISTS split_task_tags AS
+    WITH RECURSIVE split (task_id, tag, rest) AS (
+        SELECT id, NULL, tags || ',' FROM tasks WHERE tags IS NOT NULL AND tags != ''
+        UNION ALL
+        SELECT task_id,
+               trim(substr(rest, 1, instr(rest, ',') - 1), ' ' || char(9, 10, 13)),
+               substr(rest, instr(rest, ',') + 1)
+        FROM split WHERE rest != ''
+    )
+    SELECT task_id, tag FROM split WHERE tag IS NOT NULL AND tag != ''
+    ''',
+    "INSERT OR IGNORE INTO tags (name) SELECT tag FROM split_task_tags",
+    '''
+    INSERT OR IGNORE INTO task_tags (task_id, tag_id)
+    SELECT split_task_tags.task_id, tags.id
+    FROM split_task_tags JOIN tags ON tags.name = split_task_tags.tag
+    ''',
+    "DROP TABLE split_task_tags"
+]
+
+def add_column(table, column, declaration):
+    # ALTER TABLE ADD COLUMN is not idempotent, so check the schema first
+    def step(cursor):
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+    return step
+
+# Grid sort columns with a (scope, sort key, id) index per half of the user
+# scope, so a page of View Tasks is an ordered index walk (see
+# task._scoped_page_query). Each pair adds about a fifth to bulk insert time,
+# so only the default sort is indexed; other sorts sort the user's tasks.
+GRID_SORT_COLUMNS = ['due_date']
+# Index name -> (user column, partial index condition). The tasks a user
+# assigned to someone else are indexed without the self-assigned ones, which
+# the "assigned_to" half already covers and the walk would have to skip.
+GRID_SCOPES = {
+    'assigned_to': ('assigned_to', None),
+    'delegated': ('assigned_by', 'assigned_to IS NOT assigned_by')
+}
+
+def _grid_indexes():
+    return [
+        f'''
+        CREATE INDEX IF NOT EXISTS idx_tasks_grid_{scope}_{column}
+        ON tasks ({user_column}, IFNULL({column}, ''), id)
+        {f"WHERE {condition}" if condition else ""}
+        '''
+        for scope, (user_column, condition) in GRID_SCOPES.items()
+        for column in GRID_SORT_COLUMNS
+    ]
+
+# The old create_recurring_tasks stored occurrence n (n >= 2) of a recurring
+# task as a copy titled "<title> (n)"
+LEGACY_COPY_TITLE = re.compile(r"^(.*) \((\d+)\)$")
+
+def backfill_series(cursor):
+    # Recurring tasks created before series rows existed only carry the
+    # `recurring` setting, and their occurrences were already stored as
+    # copies. Each original becomes a series and its copies (found by title,
+    # people, rule and due date) its persisted occurrences. The rule ends at
+    # the last copy and dates in between without one become exceptions, so
+    # the upgrade adds no occurrence that was not there before.
+    cursor.execute(f"""
+    SELECT id, title, due_date, assigned_to, assigned_by, recurring, recurrence_end_date FROM tasks
+    WHERE rrule IS NULL AND series_id IS NULL AND IFNULL(due_date, '') != ''
+      AND recurring IN ({", ".join(f"'{recurring}'" for recurring in FREQUENCIES)})
+    ORDER BY due_date, created_date
+    """)
+    columns = ['id', 'title', 'due_date', 'assigned_to', 'assigned_by', 'recurring', 'recurrence_end_date']
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def key(row, title):
+        return (title, row['assigned_to'], row['assigned_by'], row['recurring'], row['recurrence_end_date'])
+
+    by_title = {}
+    for row in rows:
+        by_title.setdefault(key(row, row['title']), []).append(row)
+
+    # Copies of copies were made too, so follow parents up to the original
+    parents = {}
+    for row in rows:
+        match = LEGACY_COPY_TITLE.match(row['title'])
+        if not match or int(match.group(2)) < 2:
+            continue
+        freq = f"FREQ={FREQUENCIES[row['recurring']]}"
+        for parent in by_title.get(key(row, match.group(1)), []):
+            if nth_occurrence_date(freq, parent['due_date'], int(match.group(2)) - 1) == row['due_date']:
+                parents[row['id']] = parent
+                break
+
+    def original(row):
+        while row['id'] in parents:
+            row = parents[row['id']]
+        return row
+
+    series = {}
+    for row in rows:
+        series.setdefault(original(row)['id'], []).append(row)
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for series_id, members in series.items():
+        first = next(row for row in members if row['id'] == series_id)
+        copies = [row for row in members if row['id'] != series_id]
+        rrule = f"FREQ={FREQUENCIES[first['recurring']]};UNTIL={max(row['due_date'] for row in members)}"
+        cursor.execute("UPDATE tasks SET rrule = ? WHERE id = ?", (rrule, series_id))
+        # Copies now look like occurrences persisted when they were touched
+        cursor.executemany('''
+        UPDATE tasks SET series_id = ?, occurrence_date = due_date, recurring = 'None', recurrence_end_date = NULL
+        WHERE id = ?
+        ''', [(series_id, row['id']) for row in copies])
+        stored = {row['due_date'] for row in copies}
+        cursor.executemany('''
+        INSERT OR IGNORE INTO task_series_exceptions (series_id, occurrence_date, created_at)
+        VALUES (?, ?, ?)
+        ''', [(series_id, day, now) for _, day in occurrence_dates(rrule, first['due_date']) if day not in stored])
+
+# Per-user notification counters for the unread badge, kept by triggers like
+# task_counters
+def _notification_counter_upsert(row, sign):
+    return f"""
+        INSERT INTO notification_counters (user_id, unread, total)
+        VALUES ({row}.user_id, {sign}({row}.read = 0), {sign}1)
+        ON CONFLICT (user_id) DO UPDATE SET
+            unread = unread + excluded.unread,
+            total = total + excluded.total;
+    """
+
+NOTIFICATION_COUNTER_BACKFILL_SQL = '''
+INSERT INTO notification_counters (user_id, unread, total)
+SELECT user_id, SUM(read = 0), COUNT(*) FROM notifications GROUP BY user_id
+'''
+
+# Reminders fire relative to this time of day on the due date (due dates
+# carry no time); tasks.next_reminder_at is kept by triggers (by
+# arm_series_reminders for recurring series) for reminders.ReminderScheduler.
+# Nothing is scheduled for completed tasks or once the due time has passed,
+# so restored old tasks stay quiet.
+REMINDER_DUE_TIME = '09:00:00'
+REMINDER_OFFSETS = {
+    '1 hour before': '-1 hours',
+    '1 day before': '-1 days',
+    '1 week before': '-7 days'
+}
+# Series read per query when arming series reminders
+SERIES_CHUNK_SIZE = 500
+
+def _reminder_at(row):
+    offsets = " ".join(f"WHEN '{reminder}' THEN '{offset}'" for reminder, offset in REMINDER_OFFSETS.items())
+    due = f"{row}.due_date || ' {REMINDER_DUE_TIME}'"
+    return f"""
+        CASE WHEN {row}.status != 'Completed' AND datetime({due}) > datetime('now', 'localtime')
+        THEN datetime({due}, CASE {row}.reminder {offsets} END)
+        END
+    """
+
+def _reminder_offset(reminder):
+    # REMINDER_OFFSETS as a timedelta ('-1 hours' -> timedelta(hours=-1))
+    amount, unit = REMINDER_OFFSETS[reminder].split()
+    return timedelta(**{unit: int(amount)})
+
+def reminder_occurrence_date(reminder, fire_at):
+    # Due date of the occurrence a series reminder firing at `fire_at` is for
+    due = datetime.strptime(fire_at, "%Y-%m-%d %H:%M:%S") - _reminder_offset(reminder)
+    return due.strftime("%Y-%m-%d")
+
+def series_touched_dates(cursor, series_ids):
+    # {series id: occurrence dates that are persisted or deleted}
+    touched = {}
+    for start in range(0, len(series_ids), SERIES_CHUNK_SIZE):
+        chunk = series_ids[start:start + SERIES_CHUNK_SIZE]
+        placeholders = ", ".join(["?"] * len(chunk))
+        cursor.execute(f"""
+        SELECT series_id, occurrence_date FROM tasks WHERE series_id IN ({placeholders})
+        UNION ALL
+        SELECT series_id, occurrence_date FROM task_series_exceptions WHERE series_id IN ({placeholders})
+        """, chunk + chunk)
+        for series_id, day in cursor.fetchall():
+            touched.setdefault(series_id, set()).add(day)
+    return touched
+
+def _next_series_reminder(series, skip_dates, now):
+    # Fire time of the first untouched occurrence (the series row itself
+    # unless it is completed) whose reminder is still ahead of `now`
+    offset = _reminder_offset(series['reminder'])
+    due_time = datetime.strptime(REMINDER_DUE_TIME, "%H:%M:%S").time()
+    first_day = (now - offset).strftime("%Y-%m-%d")
+    days = itertools.chain(
+        [] if series['status'] == 'Completed' else [series['due_date']],
+        (day for _, day in occurrence_dates(series['rrule'], series['due_date'], first_day))
+    )
+    for day in days:
+        fire_at = datetime.combine(datetime.strptime(day, "%Y-%m-%d").date(), due_time) + offset
+        if day not in skip_dates and fire_at > now:
+            return fire_at.strftime("%Y-%m-%d %H:%M:%S")
+    return None
+
+def arm_series_reminders(cursor, series_ids=None, now=None):
+    # A recurring series is one stored row, so the triggers leave it alone:
+    # its next_reminder_at is the next occurrence's fire time, set here when
+    # the series is written and again by reminders.fire_reminders after each
+    # firing. Unlike a single task, an occurrence whose fire time has
+    # already passed is skipped rather than reminded late.
+    now = now or datetime.now()
+    query = "SELECT id, due_date, rrule, reminder, status FROM tasks WHERE rrule IS NOT NULL"
+    chunks = [None]
+    if series_ids is not None:
+        series_ids = list(series_ids)
+        chunks = [series_ids[start:start + SERIES_CHUNK_SIZE] for start in range(0, len(series_ids), SERIES_CHUNK_SIZE)]
+
+    series_rows = []
+    for chunk in chunks:
+        if chunk is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(f"{query} AND id IN ({', '.join(['?'] * len(chunk))})", chunk)
+        series_rows.extend(dict(zip(['id', 'due_date', 'rrule', 'reminder', 'status'], row)) for row in cursor.fetchall())
+
+    armed = [series['id'] for series in series_rows if series['reminder'] in REMINDER_OFFSETS and series['due_date']]
+    touched = series_touched_dates(cursor, armed)
+    armed = set(armed)
+    cursor.executemany("UPDATE tasks SET next_reminder_at = ? WHERE id = ?", [
+        (_next_series_reminder(series, touched.get(series['id'], set()), now) if series['id'] in armed else None, series['id'])
+        for series in series_rows
+    ])
+
+# Ordered schema migrations. Each entry is (version, description, steps) where
+# every step is either an SQL statement or a callable taking the cursor.
+# Steps must be idempotent so a half-upgraded database can simply be re-run.
+MIGRATIONS = [
+    (1, "Index tasks by assignee/assigner, status and due date", [
+        # get_tasks: (assigned_to = ? OR assigned_by = ?) AND status = ? ORDER BY due_date
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tasks_assigned_to_status_due
+        ON tasks (assigned_to, status, due_date)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tasks_assigned_by_status_due
+        ON tasks (assigned_by, status, due_date)
+        ''',
+        # get_tasks with a priority filter but no status filter
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tasks_assigned_to_priority_due
+        ON tasks (assigned_to, priority, due_date)
+        ''',
+        # Unscoped listings sorted by the default sort column
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tasks_due_date
+        ON tasks (due_date)
+        '''
+    ]),
+    (2, "Index notifications by user, read flag and age", [
+        # get_notifications(user_id, unread_only=True) ORDER BY created_at DESC
+        '''
+        CREATE INDEX IF NOT EXISTS idx_notifications_user_read_created
+        ON notifications (user_id, read, created_at)
+        ''',
+        # get_notifications(user_id) ORDER BY created_at DESC
+        '''
+        CREATE INDEX IF NOT EXISTS idx_notifications_user_created
+        ON notifications (user_id, created_at)
+        ''',
+        # delete_task removes the notifications of a task
+        '''
+        CREATE INDEX IF NOT EXISTS idx_notifications_task
+        ON notifications (task_id)
+        '''
+    ]),
+    (3, "Maintain per-user task counters with triggers", [
+        '''
+        CREATE TABLE IF NOT EXISTS task_counters (
+            user_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            task_count INTEGER NOT NULL DEFAULT 0,
+            time_spent INTEGER NOT NULL DEFAULT 0,
+            time_estimate INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, status, priority)
+        )
+        ''',
+        "DROP TRIGGER IF EXISTS tasks_counters_insert",
+        "DROP TRIGGER IF EXISTS tasks_counters_delete",
+        "DROP TRIGGER IF EXISTS tasks_counters_update",
+        f'''
+        CREATE TRIGGER tasks_counters_insert AFTER INSERT ON tasks
+        BEGIN
+            {_counter_upsert("NEW", "+")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER tasks_counters_delete AFTER DELETE ON tasks
+        BEGIN
+            {_counter_upsert("OLD", "-")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER tasks_counters_update
+        AFTER UPDATE OF status, priority, time_spent, time_estimate, assigned_to, assigned_by ON tasks
+        BEGIN
+            {_counter_upsert("OLD", "-")}
+            {_counter_upsert("NEW", "+")}
+        END
+        ''',
+        "DELETE FROM task_counters",
+        COUNTER_BACKFILL_SQL
+    ]),
+    (4, "Daily created/completed/overdue rollup per user", [
+        add_column("tasks", "completed_date", "TEXT"),
+        '''
+        UPDATE tasks SET completed_date = modified_date
+        WHERE status = 'Completed' AND completed_date IS NULL
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS task_daily_rollup (
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            created INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            overdue INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day)
+        )
+        ''',
+        "DROP TRIGGER IF EXISTS tasks_rollup_insert",
+        "DROP TRIGGER IF EXISTS tasks_rollup_delete",
+        "DROP TRIGGER IF EXISTS tasks_rollup_update",
+        f'''
+        CREATE TRIGGER tasks_rollup_insert AFTER INSERT ON tasks
+        BEGIN
+            {_rollup_upsert("NEW", "+")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER tasks_rollup_delete AFTER DELETE ON tasks
+        BEGIN
+            {_rollup_upsert("OLD", "-")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER tasks_rollup_update
+        AFTER UPDATE OF created_date, status, due_date, completed_date, assigned_to, assigned_by ON tasks
+        BEGIN
+            {_rollup_upsert("OLD", "-")}
+            {_rollup_upsert("NEW", "+")}
+        END
+        ''',
+        "DELETE FROM task_daily_rollup",
+        ROLLUP_BACKFILL_SQL
+    ]),
+    (5, "Lazily expanded recurring task series", [
+        add_column("tasks", "rrule", "TEXT"),
+        add_column("tasks", "series_id", "TEXT"),
+        add_column("tasks", "occurrence_date", "TEXT"),
+        # Occurrences of a series that were touched and persisted
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tasks_series_occurrence
+        ON tasks (series_id, occurrence_date) WHERE series_id IS NOT NULL
+        ''',
+        # Series definitions visible to a user
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tasks_rrule_assigned_to
+        ON tasks (assigned_to) WHERE rrule IS NOT NULL
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tasks_rrule_assigned_by
+        ON tasks (assigned_by) WHERE rrule IS NOT NULL
+        ''',
+        # Occurrences deleted before they were ever persisted
+        '''
+        CREATE TABLE IF NOT EXISTS task_series_exceptions (
+            series_id TEXT NOT NULL,
+            occurrence_date TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (series_id, occurrence_date)
+        )
+        ''',
+        backfill_series
+    ]),
+    (6, "Full-text search index over tasks", [
+        # External content: the index stores no copy of the text, only tokens
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, description, notes, tags,
+            content='tasks', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        ''',
+        "DROP TRIGGER IF EXISTS tasks_fts_insert",
+        "DROP TRIGGER IF EXISTS tasks_fts_delete",
+        "DROP TRIGGER IF EXISTS tasks_fts_update",
+        f'''
+        CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks
+        BEGIN
+            {_fts_insert("NEW")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks
+        BEGIN
+            {_fts_delete("OLD")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER tasks_fts_update
+        AFTER UPDATE OF title, description, notes, tags ON tasks
+        BEGIN
+            {_fts_delete("OLD")}
+            {_fts_insert("NEW")}
+        END
+        ''',
+        "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')"
+    ]),
+    (7, "Normalized tag index", [
+        '''
+        CREATE TABLE IF NOT EXISTS tags (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS task_tags (
+            task_id TEXT NOT NULL,
+            tag_id INTEGER NOT NULL,
+            PRIMARY KEY (task_id, tag_id),
+            FOREIGN KEY (task_id) REFERENCES tasks (id),
+            FOREIGN KEY (tag_id) REFERENCES tags (id)
+        ) WITHOUT ROWID
+        ''',
+        # Tag filters: tasks carrying a given tag
+        '''
+        CREATE INDEX IF NOT EXISTS idx_task_tags_tag
+        ON task_tags (tag_id, task_id)
+        ''',
+        "DROP TRIGGER IF EXISTS tasks_tags_delete",
+        # Tags are written by the task functions (parsing happens in Python),
+        # but every way of deleting a task has to drop its tag rows
+        '''
+        CREATE TRIGGER tasks_tags_delete AFTER DELETE ON tasks
+        BEGIN
+            DELETE FROM task_tags WHERE task_id = OLD.id;
+        END
+        ''',
+        "DELETE FROM task_tags",
+    ] + TAG_BACKFILL_SQL),
+    (8, "Trigram index for substring search on titles and tags", [
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_trigram USING fts5(
+            title, tags,
+            content='tasks', content_rowid='rowid',
+            tokenize='trigram'
+        )
+        ''',
+        "DROP TRIGGER IF EXISTS tasks_trigram_insert",
+        "DROP TRIGGER IF EXISTS tasks_trigram_delete",
+        "DROP TRIGGER IF EXISTS tasks_trigram_update",
+        f'''
+        CREATE TRIGGER tasks_trigram_insert AFTER INSERT ON tasks
+        BEGIN
+            {_fts_insert("NEW", "tasks_trigram", ["title", "tags"])}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER tasks_trigram_delete AFTER DELETE ON tasks
+        BEGIN
+            {_fts_delete("OLD", "tasks_trigram", ["title", "tags"])}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER tasks_trigram_update
+        AFTER UPDATE OF title, tags ON tasks
+        BEGIN
+            {_fts_delete("OLD", "tasks_trigram", ["title", "tags"])}
+            {_fts_insert("NEW", "tasks_trigram", ["title", "tags"])}
+        END
+        ''',
+        "INSERT INTO tasks_trigram (tasks_trigram) VALUES ('rebuild')"
+    ]),
+    (9, "Index the task grid by user scope and sort column", _grid_indexes()),
+    (10, "Case-insensitive prefix indexes for the user directory", [
+        # directory.search_users: username/email LIKE 'prefix%' is an index
+        # range scan only on a NOCASE index
+        '''
+        CREATE INDEX IF NOT EXISTS idx_users_username_nocase
+        ON users (username COLLATE NOCASE)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_users_email_nocase
+        ON users (email COLLATE NOCASE)
+        '''
+    ]),
+    (11, "Schedule task reminders by next fire time", [
+        add_column("tasks", "next_reminder_at", "TEXT"),
+        # Only pending reminders are indexed; firing one clears the column
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tasks_next_reminder
+        ON tasks (next_reminder_at) WHERE next_reminder_at IS NOT NULL
+        ''',
+        f"UPDATE tasks SET next_reminder_at = {_reminder_at('tasks')} WHERE reminder IS NOT NULL AND rrule IS NULL",
+        arm_series_reminders,
+        "DROP TRIGGER IF EXISTS tasks_reminder_insert",
+        f'''
+        CREATE TRIGGER tasks_reminder_insert AFTER INSERT ON tasks
+        WHEN NEW.reminder IS NOT NULL AND NEW.rrule IS NULL
+        BEGIN
+            UPDATE tasks SET next_reminder_at = {_reminder_at("NEW")} WHERE rowid = NEW.rowid;
+        END
+        ''',
+        # Saving the edit form rewrites every column, so only a real change
+        # re-arms a reminder that has already fired. A task that stops
+        # recurring is armed like any other.
+        "DROP TRIGGER IF EXISTS tasks_reminder_update",
+        f'''
+        CREATE TRIGGER tasks_reminder_update
+        AFTER UPDATE OF due_date, reminder, status, rrule ON tasks
+        WHEN NEW.rrule IS NULL AND (OLD.due_date IS NOT NEW.due_date OR OLD.reminder IS NOT NEW.reminder
+            OR OLD.status IS NOT NEW.status OR OLD.rrule IS NOT NULL)
+        BEGIN
+            UPDATE tasks SET next_reminder_at = {_reminder_at("NEW")} WHERE rowid = NEW.rowid;
+        END
+        '''
+    ]),
+    (12, "Maintain per-user notification counters with triggers", [
+        '''
+        CREATE TABLE IF NOT EXISTS notification_counters (
+            user_id TEXT PRIMARY KEY,
+            unread INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        "DELETE FROM notification_counters",
+        NOTIFICATION_COUNTER_BACKFILL_SQL,
+        "DROP TRIGGER IF EXISTS notifications_counters_insert",
+        "DROP TRIGGER IF EXISTS notifications_counters_delete",
+        "DROP TRIGGER IF EXISTS notifications_counters_update",
+        f'''
+        CREATE TRIGGER notifications_counters_insert AFTER INSERT ON notifications
+        BEGIN
+            {_notification_counter_upsert("NEW", "+")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER notifications_counters_delete AFTER DELETE ON notifications
+        BEGIN
+            {_notification_counter_upsert("OLD", "-")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER notifications_counters_update
+        AFTER UPDATE OF read, user_id ON notifications
+        WHEN OLD.read IS NOT NEW.read OR OLD.user_id IS NOT NEW.user_id
+        BEGIN
+            {_notification_counter_upsert("OLD", "-")}
+            {_notification_counter_upsert("NEW", "+")}
+        END
+        '''
+    ]),
+]
+
+def get_schema_version(cursor):
+    cursor.execute("SELECT MAX(version) FROM schema_version")
+    row = cursor.fetchone()
+    return row[0] or 0
+
+def apply_migrations(conn):
+    cursor = conn.cursor()
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TEXT NOT NULL
+    )
+    ''')
+    conn.commit()
+
+    current_version = get_schema_version(cursor)
+    applied = []
+
+    for version, description, steps in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version <= current_version:
+            continue
+
+        # Each migration runs in its own transaction together with its version row
+        cursor.execute("BEGIN")
+        try:
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+
+            cursor.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        applied.append(version)
+
+    return applied
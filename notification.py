@@ -2,8 +2,10 @@ import uuid
 from datetime import datetime
 import streamlit as st
 from database import get_db_connection
+from cache import cached, skip_cache, bump_data_version
 
-def get_notifications(user_id, unread_only=False):
+@cached
+def get_notifications(user_id, unread_only=False, limit=None):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -16,6 +18,10 @@ def get_notifications(user_id, unread_only=False):
         
         query += " ORDER BY created_at DESC"
         
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
         cursor.execute(query, params)
         notifications = [dict(row) for row in cursor.fetchall()]
         
@@ -23,20 +29,79 @@ def get_notifications(user_id, unread_only=False):
 
     except Exception as e:
         st.error(f"Error fetching notifications: {e}")  # Add an except block to catch errors
+        skip_cache()
         return []
 
     finally:
         conn.close()  # Always close the connection
 
+@cached
+def get_notifications_page(user_id, unread_only=False, cursor=None, page_size=20):
+    # Keyset pagination, newest first: `cursor` is the (created_at, rowid) of
+    # the last notification of the previous page. The notification indexes end
+    # in created_at (and implicitly rowid), so every page is an index range scan.
+    try:
+        conn = get_db_connection()
+        db_cursor = conn.cursor()
+        
+        query = "SELECT *, rowid AS page_rowid FROM notifications WHERE user_id = ?"
+        params = [user_id]
+        
+        if unread_only:
+            query += " AND read = 0"
+        
+        if cursor is not None:
+            query += " AND (created_at, rowid) < (?, ?)"
+            params.extend([cursor[0], cursor[1]])
+        
+        # Fetch one extra row to know whether there is a next page
+        query += " ORDER BY created_at DESC, rowid DESC LIMIT ?"
+        params.append(page_size + 1)
+        
+        db_cursor.execute(query, params)
+        notifications = [dict(row) for row in db_cursor.fetchall()]
+        conn.close()
+        
+        next_cursor = None
+        if len(notifications) > page_size:
+            notifications = notifications[:page_size]
+            next_cursor = (notifications[-1]['created_at'], notifications[-1]['page_rowid'])
+        for notification in notifications:
+            notification.pop('page_rowid')
+        
+        return notifications, next_cursor
+    except Exception as e:
+        st.error(f"Error fetching notifications: {str(e)}")
+        skip_cache()
+        return [], None
+
+def get_unread_count(user_id):
+    # Primary key lookup of the trigger-maintained counter (migration 12),
+    # cheap enough for the sidebar badge on every rerun
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT unread FROM notification_counters WHERE user_id = ?", (user_id,))
+        row = cursor.fetchone()
+        
+        conn.close()
+        return row['unread'] if row else 0
+    except Exception as e:
+        st.error(f"Error counting notifications: {str(e)}")
+        return 0
+
 def mark_notification_as_read(notification_id):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        cursor.execute("UPDATE notifications SET read = 1 WHERE id = ?", (notification_id,))
+        cursor.execute("UPDATE notifications SET read = 1 WHERE id = ? RETURNING user_id", (notification_id,))
+        notification_users = [row['user_id'] for row in cursor.fetchall()]
         
         conn.commit()
         conn.close()
+        bump_data_version(*notification_users)
         return True
     except Exception as e:
         st.error(f"Error marking notification as read: {str(e)}")
@@ -47,10 +112,12 @@ def mark_all_notifications_as_read(user_id):
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        cursor.execute("UPDATE notifications SET read = 1 WHERE user_id = ?", (user_id,))
+        # Only the unread rows: each updated row also updates the counters
+        cursor.execute("UPDATE notifications SET read = 1 WHERE user_id = ? AND read = 0", (user_id,))
         
         conn.commit()
         conn.close()
+        bump_data_version(user_id)
         return True
     except Exception as e:
         st.error(f"Error marking all notifications as read: {str(e)}")
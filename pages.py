@@ -1,15 +1,50 @@
 import streamlit as st
 from datetime import datetime, timedelta
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 
-from auth import login_user, logout_user, register_user
-from task import add_task, get_tasks, update_task, delete_task, get_task_statistics
-from notification import get_notifications, mark_notification_as_read, mark_all_notifications_as_read
+from auth import login_user, logout_user, register_user, get_user_id_by_username, get_user, change_password
+from directory import search_users, get_user_names, recent_users, remember_user
+from task import add_task, get_tasks, get_task_by_id, get_tasks_page, count_tasks, update_task, delete_task, get_task_statistics, get_task_trend, TREND_DAYS
+from task import bulk_update_status, bulk_reassign, bulk_delete, get_facet_counts
+from notification import get_notifications_page, get_unread_count, mark_notification_as_read, mark_all_notifications_as_read
 from backup import create_backup, restore_from_backup
 from export import export_tasks_to_csv, export_tasks_to_json
 from settings import get_user_settings, update_user_settings
+from tags import get_tag_counts, parse_tags
+from cache import get_cache_stats, get_data_version
+from dashboard_data import load_dashboard
+from database import get_pool_stats
+from reminders import get_reminder_stats
+
+# pandas and plotly are imported inside the pages that draw tables or charts,
+# so loading this module (every rerun of main.py) stays cheap
+
+TASKS_PAGE_SIZE = 50
+PAGE_SIZE_OPTIONS = [25, 50, 100, 200]
+
+# Notifications added per "Load More"
+NOTIFICATIONS_PAGE_SIZE = 20
+
+# Tags offered by the tag filter and the task form
+TAG_SUGGESTIONS = 30
+
+# Bulk action label -> new status (reassign and delete are handled separately)
+BULK_ACTIONS = {
+    "Mark Completed": "Completed",
+    "Mark In Progress": "In Progress",
+    "Mark Pending": "Pending",
+    "Reassign": None,
+    "Delete": None
+}
+
+# Task columns offered in the View Tasks table: column -> header
+TASK_COLUMNS = {
+    'title': 'Title',
+    'priority': 'Priority',
+    'status': 'Status',
+    'due_date': 'Due Date',
+    'assigned_to_name': 'Assigned To',
+    'tags': 'Tags'
+}
 
 def login_page():
     st.title("Advanced Task Manager")
@@ -56,10 +91,14 @@ def login_page():
                         st.error(message)
 
 def dashboard_page():
+    import pandas as pd
+    import plotly.express as px
+    
     st.title(f"Welcome, {st.session_state.username}!")
     
-    # Get task statistics
-    stats = get_task_statistics(st.session_state.user_id)
+    # Everything below renders from this one bundle
+    data = load_dashboard(st.session_state.user_id)
+    stats = data.stats
     
     # Display key metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -112,17 +151,13 @@ def dashboard_page():
     # Display upcoming tasks and overdue tasks
     st.subheader("Task Timeline")
     
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     
     with col1:
         st.markdown("#### Due Today")
-        tasks_due_today = get_tasks(
-            st.session_state.user_id, 
-            filters={'due_date': datetime.now().strftime("%Y-%m-%d"), 'status': 'Pending'}
-        )
         
-        if tasks_due_today:
-            for task in tasks_due_today:
+        if data.due_today:
+            for task in data.due_today:
                 with st.expander(f"{task['title']} - {task['priority']} Priority"):
                     st.write(f"**Description:** {task['description']}")
                     st.write(f"**Tags:** {task['tags']}")
@@ -142,23 +177,16 @@ def dashboard_page():
                             st.session_state.selected_task = task['id']
                             st.session_state.current_page = "task_details"
                             st.experimental_rerun()
+            if data.more_today:
+                st.caption("More tasks are due today, see View Tasks")
         else:
             st.info("No tasks due today")
     
     with col2:
         st.markdown("#### Overdue")
-        today = datetime.now().date()
-        overdue_tasks = []
-        
-        all_tasks = get_tasks(st.session_state.user_id, filters={'status': 'Pending'})
-        for task in all_tasks:
-            if task['due_date']:
-                due_date = datetime.strptime(task['due_date'], "%Y-%m-%d").date()
-                if due_date < today:
-                    overdue_tasks.append(task)
-        
-        if overdue_tasks:
-            for task in overdue_tasks:
+        
+        if data.overdue:
+            for task in data.overdue:
                 with st.expander(f"{task['title']} - Due: {task['due_date']}"):
                     st.write(f"**Description:** {task['description']}")
                     st.write(f"**Priority:** {task['priority']}")
@@ -178,9 +206,40 @@ def dashboard_page():
                             st.session_state.selected_task = task['id']
                             st.session_state.current_page = "task_details"
                             st.experimental_rerun()
+            if data.more_overdue:
+                st.caption("More tasks are overdue, see View Tasks")
         else:
             st.info("No overdue tasks")
     
+    with col3:
+        st.markdown("#### Due This Week")
+        
+        if data.due_this_week:
+            for task in data.due_this_week:
+                with st.expander(f"{task['title']} - Due: {task['due_date']}"):
+                    st.write(f"**Description:** {task['description']}")
+                    st.write(f"**Priority:** {task['priority']}")
+                    st.write(f"**Tags:** {task['tags']}")
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button("Mark Complete", key=f"complete_week_{task['id']}"):
+                            success, message = update_task(task['id'], {'status': 'Completed'})
+                            if success:
+                                st.success(message)
+                                st.experimental_rerun()
+                            else:
+                                st.error(message)
+                    with col2:
+                        if st.button("View Details", key=f"view_week_{task['id']}"):
+                            st.session_state.selected_task = task['id']
+                            st.session_state.current_page = "task_details"
+                            st.experimental_rerun()
+            if data.more_this_week:
+                st.caption("More tasks are due this week, see View Tasks")
+        else:
+            st.info("No other tasks due this week")
+    
     # Display task trend over time
     st.subheader("Task Creation Trend")
     
@@ -204,10 +263,8 @@ def dashboard_page():
     
     # Display notifications
     st.subheader("Recent Notifications")
-    notifications = get_notifications(st.session_state.user_id, unread_only=True)
-    
-    if notifications:
-        for notification in notifications[:5]:  # Show only the 5 most recent
+    if data.notifications:
+        for notification in data.notifications:  # Only the most recent are loaded
             with st.expander(f"{notification['message']} - {notification['created_at']}"):
                 if notification.get('task_title'):
                     st.write(f"**Task:** {notification['task_title']}")
@@ -229,8 +286,7 @@ def add_task_page():
     if 'selected_task' in st.session_state and st.session_state.selected_task:
         editing = True
         # Get task details
-        tasks = get_tasks(st.session_state.user_id)
-        task_data = next((t for t in tasks if t['id'] == st.session_state.selected_task), None)
+        task_data = get_task_by_id(st.session_state.selected_task, st.session_state.user_id)
         
         if task_data:
             st.subheader(f"Editing Task: {task_data['title']}")
@@ -239,12 +295,28 @@ def add_task_page():
             st.session_state.selected_task = None
             return
     
-    # Get all users for assignment
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, username FROM users")
-    users = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    # Assignee typeahead: the search box lives outside the form so each search
+    # reruns the page against the user directory. The options are the current
+    # assignee, this session's recent picks and the matches, never the whole
+    # users table.
+    current_assignee = task_data.get('assigned_to') or st.session_state.user_id
+    user_names = get_user_names([current_assignee, st.session_state.user_id])
+    assignee_names = {
+        user_id: user_names[user_id]
+        for user_id in [current_assignee, st.session_state.user_id]
+        if user_id in user_names
+    }
+    assignee_names.update(recent_users())
+    assignee_labels = dict(assignee_names)
+    
+    assignee_search = st.text_input("Find assignee (username or email)")
+    matches = search_users(assignee_search)
+    for user in matches:
+        assignee_names[user['id']] = user['username']
+        assignee_labels[user['id']] = f"{user['username']} ({user['email']})" if user['email'] else user['username']
+    if assignee_search and not matches:
+        st.caption(f"No users start with \"{assignee_search}\"")
+    assignee_ids = list(assignee_names)
     
     # Create a form for task input
     with st.form("task_form"):
@@ -272,14 +344,18 @@ def add_task_page():
             )
         
         with col2:
+            # A search preselects its best match
             assigned_to = st.selectbox(
                 "Assign To",
-                options=[user['id'] for user in users],
-                format_func=lambda x: next((user['username'] for user in users if user['id'] == x), x),
-                index=[user['id'] for user in users].index(task_data.get('assigned_to', st.session_state.user_id)) if task_data.get('assigned_to') in [user['id'] for user in users] else [user['id'] for user in users].index(st.session_state.user_id)
+                options=assignee_ids,
+                format_func=lambda x: assignee_labels.get(x, x),
+                index=assignee_ids.index(matches[0]['id']) if matches else 0
             )
             
             tags = st.text_input("Tags (comma separated)", value=task_data.get('tags', ''))
+            popular_tags = get_tag_counts(st.session_state.user_id, limit=TAG_SUGGESTIONS)
+            if popular_tags:
+                st.caption("Popular tags: " + ", ".join(name for name, _ in popular_tags))
             
             time_estimate = st.number_input(
                 "Estimated Time (hours)", 
@@ -358,6 +434,7 @@ def add_task_page():
                     success, message = update_task(st.session_state.selected_task, new_task_data)
                     if success:
                         st.success(message)
+                        remember_user(assigned_to, assignee_names[assigned_to])
                         # Clear selected task
                         st.session_state.selected_task = None
                         # Redirect to tasks page
@@ -370,6 +447,7 @@ def add_task_page():
                     success, message, _ = add_task(new_task_data)
                     if success:
                         st.success(message)
+                        remember_user(assigned_to, assignee_names[assigned_to])
                         # Redirect to tasks page
                         st.session_state.current_page = "view_tasks"
                         st.experimental_rerun()
@@ -383,9 +461,20 @@ def add_task_page():
             st.session_state.current_page = "view_tasks"
             st.experimental_rerun()
 
+def facet_label(value, counts):
+    # "Pending (12)" when the facet index is enabled
+    if counts is None or value == "All":
+        return value
+    return f"{value} ({counts.get(value, 0)})"
+
 def view_tasks_page():
+    import pandas as pd
+    
     st.title("View Tasks")
     
+    # Counts for every filter option under the filters currently applied
+    facet_counts = get_facet_counts(st.session_state.user_id, st.session_state.get('task_filters', {}))
+    
     # Filters
     with st.expander("Filters", expanded=True):
         col1, col2, col3, col4 = st.columns(4)
@@ -393,17 +482,30 @@ def view_tasks_page():
         with col1:
             filter_status = st.selectbox(
                 "Status",
-                ["All", "Pending", "In Progress", "Completed"]
+                ["All", "Pending", "In Progress", "Completed"],
+                format_func=lambda x: facet_label(x, facet_counts and facet_counts['status'])
             )
         
         with col2:
             filter_priority = st.selectbox(
                 "Priority",
-                ["All", "Low", "Medium", "High"]
+                ["All", "Low", "Medium", "High"],
+                format_func=lambda x: facet_label(x, facet_counts and facet_counts['priority'])
             )
         
         with col3:
-            filter_tags = st.text_input("Tags")
+            # The user's most used tags first, with how many tasks carry them
+            tag_counts = dict(get_tag_counts(st.session_state.user_id, limit=TAG_SUGGESTIONS))
+            if facet_counts:
+                tag_counts = {name: facet_counts['tags'].get(name, 0) for name in tag_counts}
+            filter_tags = st.multiselect(
+                "Tags",
+                list(tag_counts),
+                format_func=lambda x: f"{x} ({tag_counts.get(x, 0)})"
+            )
+            # Tags outside the suggestions can still be typed in
+            other_tags = st.text_input("Other tags (comma separated)")
+            tag_match = st.radio("Match", ["Any", "All"], horizontal=True)
         
         with col4:
             filter_search = st.text_input("Search")
@@ -415,73 +517,177 @@ def view_tasks_page():
         with col2:
             clear_filters = st.button("Clear Filters")
     
-    # Build filters dictionary
-    filters = {}
+    # Build filters dictionary (kept in session state so paging keeps them)
     if apply_filters:
+        filters = {}
         if filter_status != "All":
             filters['status'] = filter_status
         
         if filter_priority != "All":
             filters['priority'] = filter_priority
         
+        filter_tags = parse_tags(filter_tags + parse_tags(other_tags))
         if filter_tags:
-            filters['tags'] = filter_tags
+            filters['tags'] = tuple(filter_tags)
+            filters['tag_match'] = tag_match.lower()
         
         if filter_search:
             filters['search'] = filter_search
+        
+        st.session_state.task_filters = filters
+        if facet_counts is not None:
+            # Redraw so the option counts reflect the new filters
+            st.experimental_rerun()
     
     if clear_filters:
         # Reset all filters
+        st.session_state.task_filters = {}
         st.experimental_rerun()
     
-    # Get tasks with filters
-    tasks = get_tasks(st.session_state.user_id, filters=filters)
+    filters = st.session_state.get('task_filters', {})
     
-    # Display tasks
-    if tasks:
-        # Sorting options
-        col1, col2 = st.columns([1, 4])
-        with col1:
-            sort_by = st.selectbox(
-                "Sort By",
-                ["due_date", "priority", "status", "title"]
-            )
-        with col2:
-            sort_order = st.radio(
-                "Order",
-                ["Ascending", "Descending"],
-                horizontal=True
-            )
-        
-        # Sort tasks
-        tasks = get_tasks(
-            st.session_state.user_id, 
+    # Sorting options
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        # Searches default to best matches first
+        sort_options = ["due_date", "priority", "status", "title"]
+        if 'search' in filters:
+            sort_options.insert(0, "relevance")
+        sort_by = st.selectbox(
+            "Sort By",
+            sort_options
+        )
+    with col2:
+        sort_order = st.radio(
+            "Order",
+            ["Ascending", "Descending"],
+            horizontal=True
+        )
+    with col3:
+        page_size = st.selectbox(
+            "Rows per page",
+            PAGE_SIZE_OPTIONS,
+            index=PAGE_SIZE_OPTIONS.index(TASKS_PAGE_SIZE)
+        )
+    sort_order = "asc" if sort_order == "Ascending" else "desc"
+    
+    # Start again from the first page whenever the filters, sort or page size change
+    query_key = (tuple(sorted(filters.items())), sort_by, sort_order, page_size)
+    if st.session_state.get('task_query_key') != query_key:
+        st.session_state.task_query_key = query_key
+        st.session_state.task_page_cursors = [None]
+    
+    page_cursors = st.session_state.task_page_cursors
+    
+    # The grid only ever loads the visible page; the total is a count query
+    # (or a popcount when the facet index is enabled)
+    if facet_counts:
+        total_tasks = facet_counts['total']
+    else:
+        total_tasks = count_tasks(st.session_state.user_id, filters)
+    st.caption(f"{total_tasks} matching tasks")
+    
+    # Load the page once into a DataFrame kept in session state. Reruns that
+    # only change the columns, the selected task or an expander are served
+    # from it; a new filter, sort, page or any write to the user's data
+    # (data version) loads it again.
+    load_key = (query_key, page_cursors[-1], get_data_version(st.session_state.user_id), datetime.now().date())
+    if st.session_state.get('task_frame_key') != load_key:
+        tasks, next_cursor = get_tasks_page(
+            st.session_state.user_id,
             filters=filters,
             sort_by=sort_by,
-            sort_order="asc" if sort_order == "Ascending" else "desc"
+            sort_order=sort_order,
+            cursor=page_cursors[-1],
+            page_size=page_size
+        )
+        st.session_state.task_frame = pd.DataFrame(tasks)
+        st.session_state.task_frame_next = next_cursor
+        st.session_state.task_frame_key = load_key
+    
+    tasks_df = st.session_state.task_frame
+    next_cursor = st.session_state.task_frame_next
+    
+    # Display tasks
+    if not tasks_df.empty:
+        # Display the chosen columns of the loaded page
+        shown_columns = st.multiselect(
+            "Columns",
+            list(TASK_COLUMNS),
+            default=list(TASK_COLUMNS),
+            format_func=lambda x: TASK_COLUMNS[x]
         )
+        task_df = tasks_df.reindex(columns=shown_columns).rename(columns=TASK_COLUMNS)
         
-        # Display tasks in a table
-        task_df = pd.DataFrame([
-            {
-                'Title': t['title'],
-                'Priority': t['priority'],
-                'Status': t['status'],
-                'Due Date': t['due_date'],
-                'Assigned To': t['assigned_to_name'],
-                'Tags': t['tags']
-            } for t in tasks
-        ])
+        # Show where each search hit matched
+        if 'search_snippet' in tasks_df and tasks_df['search_snippet'].notna().any():
+            task_df['Match'] = tasks_df['search_snippet'].fillna('')
         
         st.dataframe(task_df, use_container_width=True)
         
-        # Export options
+        # Page navigation
+        col1, col2, col3 = st.columns([1, 4, 1])
+        with col1:
+            if len(page_cursors) > 1 and st.button("Previous Page"):
+                page_cursors.pop()
+                st.experimental_rerun()
+        with col2:
+            st.caption(f"Page {len(page_cursors)} of {max(1, -(-total_tasks // page_size))}")
+        with col3:
+            if next_cursor is not None and st.button("Next Page"):
+                page_cursors.append(next_cursor)
+                st.experimental_rerun()
+        
+        # Bulk actions on the selected tasks or on everything matching the filters
+        with st.expander("Bulk Actions"):
+            page_tasks = dict(zip(tasks_df['id'], tasks_df['title']))
+            selected_ids = st.multiselect(
+                "Tasks",
+                options=list(page_tasks),
+                format_func=lambda x: page_tasks.get(x, x)
+            )
+            apply_to_all = st.checkbox("Apply to all tasks matching the current filters")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                bulk_action = st.selectbox(
+                    "Action",
+                    BULK_ACTIONS
+                )
+            with col2:
+                new_assignee = st.text_input("Reassign to (username)")
+            
+            if st.button("Apply to Tasks"):
+                # None means "resolve the ids from the filters"
+                task_ids = None if apply_to_all else selected_ids
+                
+                if task_ids == []:
+                    success, message = False, "Select at least one task"
+                elif bulk_action == "Reassign":
+                    assignee_id = get_user_id_by_username(new_assignee)
+                    if assignee_id:
+                        success, message = bulk_reassign(assignee_id, task_ids, st.session_state.user_id, filters)
+                    else:
+                        success, message = False, f"Unknown user: {new_assignee}"
+                elif bulk_action == "Delete":
+                    success, message = bulk_delete(task_ids, st.session_state.user_id, filters)
+                else:
+                    success, message = bulk_update_status(BULK_ACTIONS[bulk_action], task_ids, st.session_state.user_id, filters)
+                
+                if success:
+                    st.success(message)
+                    st.session_state.task_page_cursors = [None]
+                    st.experimental_rerun()
+                else:
+                    st.error(message)
+        
+        # Export options (exports every matching task, not just this page)
         st.subheader("Export Tasks")
         col1, col2 = st.columns(2)
         
         with col1:
             if st.button("Export as CSV"):
-                csv_data = export_tasks_to_csv(tasks)
+                csv_data = export_tasks_to_csv(get_tasks(st.session_state.user_id, filters, sort_by, sort_order))
                 if csv_data:
                     st.download_button(
                         "Download CSV",
@@ -492,7 +698,7 @@ def view_tasks_page():
         
         with col2:
             if st.button("Export as JSON"):
-                json_data = export_tasks_to_json(tasks)
+                json_data = export_tasks_to_json(get_tasks(st.session_state.user_id, filters, sort_by, sort_order))
                 if json_data:
                     st.download_button(
                         "Download JSON",
@@ -503,14 +709,16 @@ def view_tasks_page():
         
         # Task details section
         st.subheader("Task Details")
+        task_titles = dict(zip(tasks_df['id'], tasks_df['title']))
         selected_task_id = st.selectbox(
             "Select a task to view details",
-            options=[t['id'] for t in tasks],
-            format_func=lambda x: next((t['title'] for t in tasks if t['id'] == x), x)
+            options=list(task_titles),
+            format_func=lambda x: task_titles.get(x, x)
         )
         
         if selected_task_id:
-            selected_task = next((t for t in tasks if t['id'] == selected_task_id), None)
+            selected_rows = tasks_df[tasks_df['id'] == selected_task_id]
+            selected_task = selected_rows.iloc[0].to_dict() if not selected_rows.empty else None
             
             if selected_task:
                 with st.expander("Task Details", expanded=True):
@@ -518,4 +726,413 @@ def view_tasks_page():
                     st.write(f"**Description:** {selected_task['description']}")
                     st.write(f"**Priority:** {selected_task['priority']}")
                     st.write(f"**Status:** {selected_task['status']}")
-                    st.write(f"**Due Date:** {selected_task['
+                    st.write(f"**Due Date:** {selected_task['due_date']}")
+                    st.write(f"**Assigned To:** {selected_task['assigned_to_name']}")
+                    st.write(f"**Tags:** {selected_task['tags']}")
+                    
+                    if selected_task.get('search_snippet'):
+                        st.markdown(f"**Match:** {selected_task['search_snippet']}")
+                    
+                    if selected_task.get('notes'):
+                        st.write(f"**Notes:** {selected_task['notes']}")
+                    
+                    # Task actions
+                    col1, col2, col3 = st.columns(3)
+                    
+                    with col1:
+                        if st.button("Edit Task"):
+                            st.session_state.selected_task = selected_task_id
+                            st.session_state.current_page = "add_task"
+                            st.experimental_rerun()
+                    
+                    with col2:
+                        if selected_task['status'] != 'Completed':
+                            if st.button("Mark as Complete"):
+                                success, message = update_task(selected_task_id, {'status': 'Completed'})
+                                if success:
+                                    st.success(message)
+                                    st.experimental_rerun()
+                                else:
+                                    st.error(message)
+                        else:
+                            if st.button("Mark as Pending"):
+                                success, message = update_task(selected_task_id, {'status': 'Pending'})
+                                if success:
+                                    st.success(message)
+                                    st.experimental_rerun()
+                                else:
+                                    st.error(message)
+                    
+                    with col3:
+                        if st.button("Delete Task"):
+                            st.session_state.confirm_delete = selected_task_id
+                            st.experimental_rerun()
+                
+                # Confirm delete dialog
+                if 'confirm_delete' in st.session_state and st.session_state.confirm_delete == selected_task_id:
+                    st.warning("Are you sure you want to delete this task? This action cannot be undone.")
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        if st.button("Yes, Delete"):
+                            success, message = delete_task(selected_task_id)
+                            if success:
+                                st.success(message)
+                                st.session_state.confirm_delete = None
+                                st.experimental_rerun()
+                            else:
+                                st.error(message)
+                    
+                    with col2:
+                        if st.button("Cancel"):
+                            st.session_state.confirm_delete = None
+                            st.experimental_rerun()
+    else:
+        st.info("No tasks found. Add a new task to get started!")
+        
+        if st.button("Add New Task"):
+            st.session_state.current_page = "add_task"
+            st.experimental_rerun()
+
+def statistics_page():
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
+    st.title("Task Statistics and Reports")
+    
+    # Get task statistics
+    stats = get_task_statistics(st.session_state.user_id)
+    
+    # Summary metrics
+    st.subheader("Task Summary")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Tasks", stats.get('total', 0))
+    
+    with col2:
+        completion_rate = stats.get('completion_rate', 0)
+        st.metric("Completion Rate", f"{completion_rate:.1f}%")
+    
+    with col3:
+        st.metric("Overdue Tasks", stats.get('overdue', 0))
+    
+    with col4:
+        st.metric("Due This Week", stats.get('due_this_week', 0))
+    
+    # Task status breakdown
+    st.subheader("Task Status Breakdown")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        status_data = {
+            'Completed': stats.get('completed', 0),
+            'In Progress': stats.get('in_progress', 0),
+            'Pending': stats.get('pending', 0)
+        }
+        
+        status_df = pd.DataFrame({
+            'Status': list(status_data.keys()),
+            'Count': list(status_data.values())
+        })
+        
+        fig = px.pie(status_df, values='Count', names='Status',
+                    title='Tasks by Status',
+                    color_discrete_sequence=px.colors.qualitative.Pastel)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        priority_data = {
+            'High': stats.get('priority_high', 0),
+            'Medium': stats.get('priority_medium', 0),
+            'Low': stats.get('priority_low', 0)
+        }
+        
+        priority_df = pd.DataFrame({
+            'Priority': list(priority_data.keys()),
+            'Count': list(priority_data.values())
+        })
+        
+        fig = px.bar(priority_df, x='Priority', y='Count',
+                    title='Tasks by Priority',
+                    color='Priority',
+                    color_discrete_sequence=px.colors.qualitative.Bold)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Task trend over time (read from the daily rollup for the selected range only)
+    st.subheader("Task Creation Trend")
+    
+    today = datetime.now().date()
+    trend_range = st.date_input(
+        "Date Range",
+        value=(today - timedelta(days=TREND_DAYS), today)
+    )
+    
+    if isinstance(trend_range, (list, tuple)) and len(trend_range) == 2:
+        trend_rows = get_task_trend(
+            st.session_state.user_id,
+            trend_range[0].strftime('%Y-%m-%d'),
+            trend_range[1].strftime('%Y-%m-%d')
+        )
+    else:
+        trend_rows = []
+    
+    if trend_rows:
+        trend_df = pd.DataFrame(trend_rows).rename(columns={
+            'day': 'Date',
+            'created': 'Created',
+            'completed': 'Completed',
+            'overdue': 'Due (still open)'
+        })
+        trend_df['Date'] = pd.to_datetime(trend_df['Date'])
+        
+        fig = px.line(trend_df, x='Date', y=['Created', 'Completed', 'Due (still open)'],
+                     title='Tasks Created and Completed Over Time',
+                     markers=True)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No task trend data available")
+    
+    # Time efficiency
+    st.subheader("Time Efficiency")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("Estimated Time (hours)", round(stats.get('estimated_time', 0) / 60, 1))
+    
+    with col2:
+        st.metric("Time Spent (hours)", round(stats.get('time_spent', 0) / 60, 1))
+    
+    if stats.get('estimated_time', 0) > 0:
+        efficiency = (stats.get('time_spent', 0) / stats.get('estimated_time', 0)) * 100
+        
+        fig = go.Figure(go.Indicator(
+            mode="gauge+number",
+            value=efficiency,
+            title={'text': "Time Efficiency"},
+            gauge={
+                'axis': {'range': [0, 200], 'tickwidth': 1},
+                'bar': {'color': "darkblue"},
+                'steps': [
+                    {'range': [0, 80], 'color': "lightgreen"},
+                    {'range': [80, 120], 'color': "yellow"},
+                    {'range': [120, 200], 'color': "red"}
+                ],
+                'threshold': {
+                    'line': {'color': "red", 'width': 4},
+                    'thickness': 0.75,
+                    'value': 100
+                }
+            }
+        ))
+        
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No time data available for efficiency calculation")
+
+def settings_page():
+    st.title("Settings")
+    
+    # Get current user settings
+    settings = get_user_settings(st.session_state.user_id)
+    
+    # Tabs for different settings categories
+    tab1, tab2, tab3, tab4 = st.tabs(["Appearance", "Backup & Restore", "Account", "Performance"])
+    
+    with tab1:
+        st.subheader("Appearance Settings")
+        
+        # Theme selection
+        theme = st.selectbox(
+            "Theme",
+            ["light", "dark", "custom"],
+            index=["light", "dark", "custom"].index(settings.get('theme', 'light')) if settings.get('theme') in ["light", "dark", "custom"] else 0
+        )
+        
+        # Custom theme options
+        if theme == "custom":
+            primary_color = st.color_picker("Primary Color", settings.get('primary_color', '#3b82f6'))
+            secondary_color = st.color_picker("Secondary Color", settings.get('secondary_color', '#64748b'))
+            background_color = st.color_picker("Background Color", settings.get('background_color', '#f1f5f9'))
+            text_color = st.color_picker("Text Color", settings.get('text_color', '#0f172a'))
+        
+        # Save appearance settings
+        if st.button("Save Appearance Settings"):
+            new_settings = {'theme': theme}
+            
+            if theme == "custom":
+                new_settings['primary_color'] = primary_color
+                new_settings['secondary_color'] = secondary_color
+                new_settings['background_color'] = background_color
+                new_settings['text_color'] = text_color
+            
+            success, message = update_user_settings(st.session_state.user_id, new_settings)
+            if success:
+                st.success(message)
+                st.experimental_rerun()
+            else:
+                st.error(message)
+    
+    with tab2:
+        st.subheader("Backup & Restore")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("#### Create Backup")
+            
+            if st.button("Create Backup"):
+                success, backup_data, filename = create_backup(st.session_state.user_id)
+                
+                if success:
+                    st.success(f"Backup created: {filename}")
+                    st.download_button(
+                        "Download Backup",
+                        backup_data,
+                        filename,
+                        "application/json"
+                    )
+                else:
+                    st.error(backup_data)  # Error message is in backup_data
+        
+        with col2:
+            st.markdown("#### Restore from Backup")
+            
+            uploaded_file = st.file_uploader("Upload Backup File", type=["json"])
+            
+            if uploaded_file is not None:
+                if st.button("Restore from Backup"):
+                    backup_data = uploaded_file.getvalue().decode('utf-8')
+                    success, message = restore_from_backup(backup_data, st.session_state.user_id)
+                    
+                    if success:
+                        st.success(message)
+                    else:
+                        st.error(message)
+    
+    with tab3:
+        st.subheader("Account Settings")
+        
+        # Get user details
+        user = get_user(st.session_state.user_id) or {}
+        
+        # Display account info
+        st.markdown("#### Account Information")
+        st.write(f"**Username:** {user.get('username')}")
+        st.write(f"**Email:** {user.get('email') or 'Not set'}")
+        st.write(f"**Account Created:** {user.get('created_at')}")
+        st.write(f"**Last Login:** {user.get('last_login')}")
+        
+        # Change password
+        st.markdown("#### Change Password")
+        
+        with st.form("change_password_form"):
+            current_password = st.text_input("Current Password", type="password")
+            new_password = st.text_input("New Password", type="password")
+            confirm_password = st.text_input("Confirm New Password", type="password")
+            
+            submit = st.form_submit_button("Change Password")
+            
+            if submit:
+                if not current_password or not new_password or not confirm_password:
+                    st.error("All fields are required")
+                elif new_password != confirm_password:
+                    st.error("New passwords do not match")
+                else:
+                    success, message = change_password(st.session_state.user_id, current_password, new_password)
+                    if success:
+                        st.success(message)
+                    else:
+                        st.error(message)
+    
+    with tab4:
+        st.subheader("Query Cache")
+        
+        cache_stats = get_cache_stats()
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Hit Rate", f"{cache_stats['hit_rate'] * 100:.1f}%")
+        
+        with col2:
+            st.metric("Hits", cache_stats['hits'])
+        
+        with col3:
+            st.metric("Misses", cache_stats['misses'])
+        
+        with col4:
+            st.metric("Entries", f"{cache_stats['entries']} / {cache_stats['max_entries']}")
+        
+        st.caption(
+            f"Invalidated by writes: {cache_stats['stale']} · "
+            f"expired (TTL {cache_stats['ttl']}s): {cache_stats['expired']} · "
+            f"evicted: {cache_stats['evicted']}"
+        )
+        
+        st.subheader("Connection Pool")
+        st.json(get_pool_stats())
+        
+        st.subheader("Reminder Scheduler")
+        st.json(get_reminder_stats())
+
+
+def notifications_page():
+    st.title("Notifications")
+    
+    user_id = st.session_state.user_id
+    unread_count = get_unread_count(user_id)
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        unread_only = st.checkbox("Unread only")
+        st.caption(f"{unread_count} unread")
+    
+    with col2:
+        if unread_count and st.button("Mark All as Read"):
+            if mark_all_notifications_as_read(user_id):
+                st.success("All notifications marked as read.")
+                st.experimental_rerun()
+    
+    # "Load More" only raises the number of pages shown. Pages are walked from
+    # the newest with each page's own next cursor (every page is cached), so
+    # marking one as read never repeats or skips a notification further down.
+    view_key = (user_id, unread_only)
+    if st.session_state.get('notifications_view') != view_key:
+        st.session_state.notifications_view = view_key
+        st.session_state.notifications_pages = 1
+    
+    notifications = []
+    cursor = None
+    for _ in range(st.session_state.notifications_pages):
+        page, cursor = get_notifications_page(user_id, unread_only, cursor, NOTIFICATIONS_PAGE_SIZE)
+        notifications.extend(page)
+        if cursor is None:
+            break
+    
+    if not notifications:
+        st.info("No unread notifications" if unread_only else "You have no notifications.")
+        return
+    
+    for notification in notifications:
+        col1, col2 = st.columns([10, 1])
+        
+        with col1:
+            if notification['read']:
+                st.write(notification['message'])
+            else:
+                st.markdown(f"**{notification['message']}**")
+            st.caption(f"Received: {notification['created_at']}")
+        
+        with col2:
+            if not notification['read'] and st.button("Mark as Read", key=f"read_{notification['id']}"):
+                mark_notification_as_read(notification['id'])
+                st.experimental_rerun()
+        
+        st.divider()
+    
+    if cursor is not None and st.button("Load More"):
+        st.session_state.notifications_pages += 1
+        st.experimental_rerun()
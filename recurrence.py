@@ -0,0 +1,173 @@
+import calendar
+from datetime import datetime, timedelta
+
+# Recurring tasks are stored as a single series row carrying an RRULE-style
+# rule; its occurrences are computed on demand and only persisted once touched.
+FREQUENCIES = {
+    'Daily': 'DAILY',
+    'Weekly': 'WEEKLY',
+    'Monthly': 'MONTHLY',
+    'Yearly': 'YEARLY'
+}
+
+# Occurrences (including the series row itself) when no end date is given
+DEFAULT_COUNTS = {
+    'DAILY': 31,
+    'WEEKLY': 13,
+    'MONTHLY': 7,
+    'YEARLY': 4
+}
+
+# Virtual occurrence ids look like "<series id>@<YYYY-MM-DD>"
+VIRTUAL_ID_SEPARATOR = '@'
+
+def build_rrule(recurring, recurrence_end_date=None):
+    freq = FREQUENCIES.get(recurring)
+    if not freq:
+        return None
+    if recurrence_end_date:
+        return f"FREQ={freq};UNTIL={recurrence_end_date}"
+    return f"FREQ={freq};COUNT={DEFAULT_COUNTS[freq]}"
+
+def parse_rrule(rrule):
+    parts = dict(part.split('=', 1) for part in rrule.split(';') if part)
+    rule = {'freq': parts['FREQ'], 'count': None, 'until': None}
+    if 'COUNT' in parts:
+        rule['count'] = int(parts['COUNT'])
+    if 'UNTIL' in parts:
+        rule['until'] = datetime.strptime(parts['UNTIL'], "%Y-%m-%d").date()
+    return rule
+
+def _add_months(start, months):
+    month_index = start.month - 1 + months
+    year = start.year + month_index // 12
+    month = month_index % 12 + 1
+    # Clamp e.g. Jan 31 + 1 month to Feb 28/29
+    day = min(start.day, calendar.monthrange(year, month)[1])
+    return start.replace(year=year, month=month, day=day)
+
+def _nth_occurrence(freq, start, n):
+    if freq == 'DAILY':
+        return start + timedelta(days=n)
+    if freq == 'WEEKLY':
+        return start + timedelta(weeks=n)
+    if freq == 'MONTHLY':
+        return _add_months(start, n)
+    return _add_months(start, 12 * n)
+
+def _first_index_on_or_after(freq, start, day):
+    # Jump straight to the window for fixed-length periods
+    if day <= start:
+        return 0
+    if freq == 'DAILY':
+        return (day - start).days
+    if freq == 'WEEKLY':
+        return -(-(day - start).days // 7)
+    if freq == 'MONTHLY':
+        n = max((day.year - start.year) * 12 + day.month - start.month - 1, 0)
+    else:
+        n = max(day.year - start.year - 1, 0)
+    while _nth_occurrence(freq, start, n) < day:
+        n += 1
+    return n
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    return value
+
+def _last_index_on_or_before(freq, start, day):
+    return _first_index_on_or_after(freq, start, day + timedelta(days=1)) - 1
+
+def occurrence_range(rrule, dtstart, window_start=None, window_end=None):
+    # (first, last) index of the occurrences after the series row itself
+    # (index 0) inside the optional [window_start, window_end] range; empty
+    # when first > last. Computed from the rule, without walking it.
+    rule = parse_rrule(rrule)
+    freq = rule['freq']
+    start = _as_date(dtstart)
+
+    first = 1
+    if window_start is not None:
+        first = max(first, _first_index_on_or_after(freq, start, _as_date(window_start)))
+
+    # Rules are always bounded; one with neither COUNT nor UNTIL gets the default horizon
+    last = (rule['count'] or DEFAULT_COUNTS[freq]) - 1
+    if rule['until'] is not None:
+        last = _last_index_on_or_before(freq, start, rule['until'])
+        if rule['count'] is not None:
+            last = min(last, rule['count'] - 1)
+    if window_end is not None:
+        last = min(last, _last_index_on_or_before(freq, start, _as_date(window_end)))
+    return first, last
+
+def occurrence_dates(rrule, dtstart, window_start=None, window_end=None, reverse=False):
+    # Yield (index, date) for every occurrence in the range occurrence_range
+    # gives, latest first with `reverse`
+    freq = parse_rrule(rrule)['freq']
+    start = _as_date(dtstart)
+    first, last = occurrence_range(rrule, dtstart, window_start, window_end)
+    indexes = range(last, first - 1, -1) if reverse else range(first, last + 1)
+    for n in indexes:
+        yield n, _nth_occurrence(freq, start, n).strftime("%Y-%m-%d")
+
+def nth_occurrence_date(rrule, dtstart, n):
+    # Due date of occurrence n (0 is the series row itself), ignoring the
+    # rule's end
+    freq = parse_rrule(rrule)['freq']
+    return _nth_occurrence(freq, _as_date(dtstart), n).strftime("%Y-%m-%d")
+
+def occurrence_count(rrule, dtstart, window_start=None, window_end=None, skip_dates=()):
+    # Number of occurrences occurrence_dates would yield, minus the skipped
+    # dates that are occurrences inside the range
+    freq = parse_rrule(rrule)['freq']
+    start = _as_date(dtstart)
+    first, last = occurrence_range(rrule, dtstart, window_start, window_end)
+    if first > last:
+        return 0
+    skipped = 0
+    for day in set(skip_dates):
+        index = _first_index_on_or_after(freq, start, _as_date(day))
+        if first <= index <= last and _nth_occurrence(freq, start, index) == _as_date(day):
+            skipped += 1
+    return last - first + 1 - skipped
+
+def make_virtual_id(series_id, occurrence_date):
+    return f"{series_id}{VIRTUAL_ID_SEPARATOR}{occurrence_date}"
+
+def is_virtual_id(task_id):
+    return isinstance(task_id, str) and VIRTUAL_ID_SEPARATOR in task_id
+
+def split_virtual_id(task_id):
+    series_id, occurrence_date = task_id.rsplit(VIRTUAL_ID_SEPARATOR, 1)
+    return series_id, occurrence_date
+
+def expand_series(series, window_start=None, window_end=None, skip_dates=(), limit=None, reverse=False):
+    # Build task dicts for the untouched occurrences of a series row (at most
+    # `limit`, the latest ones with `reverse`). Occurrences keep the series
+    # title and start out Pending with no time logged, like a fresh task.
+    if not series.get('rrule') or not series.get('due_date'):
+        return []
+
+    occurrences = []
+    for _, day in occurrence_dates(series['rrule'], series['due_date'], window_start, window_end, reverse):
+        if limit is not None and len(occurrences) >= limit:
+            break
+        if day in skip_dates:
+            continue
+        task = dict(series)
+        task.update({
+            'id': make_virtual_id(series['id'], day),
+            'status': 'Pending',
+            'due_date': day,
+            'time_spent': 0,
+            'completed_date': None,
+            'recurring': 'None',
+            'recurrence_end_date': None,
+            'rrule': None,
+            'series_id': series['id'],
+            'occurrence_date': day,
+            'virtual': True
+        })
+        occurrences.append(task)
+    return occurrences
@@ -0,0 +1,208 @@
+import heapq
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from database import STORAGE_CONFIG, db_connection
+from cache import bump_data_version
+from migrations import REMINDER_OFFSETS, arm_series_reminders, reminder_occurrence_date, series_touched_dates
+
+# Background scheduler turning task reminders into notifications.
+# Triggers (migration 11) keep tasks.next_reminder_at at each task's next fire
+# time; the scheduler holds only the reminders due within LOAD_HORIZON in a
+# heap, topped up from the partial index on that column. Firing clears
+# next_reminder_at in the same transaction that inserts the notification, so a
+# restart loads just the pending reminders again (ones that came due while
+# the app was down fire late, once). A recurring series carries the fire time
+# of its next occurrence and is re-armed after each firing. Configured by the
+# "reminders" storage setting (TASK_MANAGER_DB_REMINDERS=0 turns it off).
+
+LOAD_HORIZON = timedelta(hours=1)
+# Longest sleep between index reads, so reminders added since the last read
+# (by this or another process) are picked up
+POLL_SECONDS = 60
+# Reminders held in memory at once; a larger backlog waits in the index
+MAX_PENDING = 10000
+FIRE_BATCH_SIZE = 500
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+logger = logging.getLogger(__name__)
+
+def fire_reminders(task_ids, now=None):
+    # Notify the assignees of the given tasks whose reminder is due at `now`.
+    # The UPDATE ... RETURNING claims the reminders, so a task whose reminder
+    # was moved or cleared since it was loaded, or that another process has
+    # already fired, is skipped. A recurring series' reminder is for one of
+    # its occurrences: it is dropped when that occurrence has since been
+    # persisted (the stored task has its own reminder) or deleted, and the
+    # series is armed for its next occurrence. Returns the number of
+    # notifications sent.
+    now = now or datetime.now().strftime(TIMESTAMP_FORMAT)
+    fired = []
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(task_ids), FIRE_BATCH_SIZE):
+            chunk = task_ids[start:start + FIRE_BATCH_SIZE]
+            placeholders = ", ".join(["?"] * len(chunk))
+            # RETURNING only sees the cleared column, so read the fire times first
+            cursor.execute(f"""
+            SELECT id, title, due_date, assigned_to, rrule, reminder, next_reminder_at FROM tasks
+            WHERE id IN ({placeholders}) AND next_reminder_at IS NOT NULL AND next_reminder_at <= ?
+            """, list(chunk) + [now])
+            due = {task['id']: dict(task) for task in cursor.fetchall()}
+            cursor.execute(f"""
+            UPDATE tasks SET next_reminder_at = NULL
+            WHERE id IN ({placeholders}) AND next_reminder_at IS NOT NULL AND next_reminder_at <= ?
+            RETURNING id
+            """, list(chunk) + [now])
+            fired.extend(due[row['id']] for row in cursor.fetchall() if row['id'] in due)
+
+        series_ids = [task['id'] for task in fired if task['rrule']]
+        touched = series_touched_dates(cursor, series_ids)
+        notifications = []
+        for task in fired:
+            due_date = task['due_date']
+            if task['rrule']:
+                if task['reminder'] not in REMINDER_OFFSETS:
+                    continue
+                due_date = reminder_occurrence_date(task['reminder'], task['next_reminder_at'])
+                if due_date in touched.get(task['id'], ()):
+                    continue
+            notifications.append(
+                (str(uuid.uuid4()), task['assigned_to'], task['id'], f"Reminder: {task['title']} is due on {due_date}", now)
+            )
+
+        cursor.executemany('''
+        INSERT INTO notifications (id, user_id, task_id, message, created_at)
+        VALUES (?, ?, ?, ?, ?)
+        ''', notifications)
+        arm_series_reminders(cursor, series_ids, datetime.strptime(now, TIMESTAMP_FORMAT))
+
+    bump_data_version(*[notification[1] for notification in notifications])
+    return len(notifications)
+
+class ReminderScheduler:
+    def __init__(self, horizon=LOAD_HORIZON, poll_seconds=POLL_SECONDS, max_pending=MAX_PENDING):
+        self.horizon = horizon
+        self.poll_seconds = poll_seconds
+        self.max_pending = max_pending
+        # (fire time, task id); an entry is live while it matches _pending,
+        # so a reloaded task with a new fire time leaves a stale entry behind
+        self._heap = []
+        self._pending = {}
+        self._next_load = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {
+            'loads': 0,
+            'loaded': 0,
+            'fired': 0,
+            'skipped': 0,
+            'errors': 0
+        }
+
+    def _load(self, now):
+        # Index range scan over the reminders due before now + horizon
+        # (including overdue ones left by a restart)
+        until = (now + self.horizon).strftime(TIMESTAMP_FORMAT)
+        with db_connection() as conn:
+            rows = conn.execute('''
+            SELECT id, next_reminder_at FROM tasks
+            WHERE next_reminder_at IS NOT NULL AND next_reminder_at <= ?
+            ORDER BY next_reminder_at
+            LIMIT ?
+            ''', (until, self.max_pending)).fetchall()
+
+        for task_id, fire_at in rows:
+            if self._pending.get(task_id) != fire_at:
+                self._pending[task_id] = fire_at
+                heapq.heappush(self._heap, (fire_at, task_id))
+                self.stats['loaded'] += 1
+        self.stats['loads'] += 1
+        # A full window means a backlog: read again as soon as the heap drains
+        return len(rows) < self.max_pending
+
+    def _pop_due(self, now):
+        due = []
+        now = now.strftime(TIMESTAMP_FORMAT)
+        while self._heap and self._heap[0][0] <= now and len(due) < FIRE_BATCH_SIZE:
+            fire_at, task_id = heapq.heappop(self._heap)
+            if self._pending.get(task_id) == fire_at:
+                del self._pending[task_id]
+                due.append(task_id)
+        return due
+
+    def run_once(self, now=None):
+        # Load and fire whatever is due; returns the seconds until the next
+        # reminder or index read, whichever comes first
+        now = now or datetime.now()
+        complete = True
+        if time.monotonic() >= self._next_load:
+            complete = self._load(now)
+            self._next_load = time.monotonic() + self.poll_seconds
+
+        due = self._pop_due(now)
+        while due:
+            fired = fire_reminders(due, now.strftime(TIMESTAMP_FORMAT))
+            self.stats['fired'] += fired
+            self.stats['skipped'] += len(due) - fired
+            due = self._pop_due(now)
+
+        if not complete:
+            self._next_load = 0
+        wait = self._next_load - time.monotonic()
+        if self._heap:
+            next_fire = datetime.strptime(self._heap[0][0], TIMESTAMP_FORMAT)
+            wait = min(wait, (next_fire - datetime.now()).total_seconds())
+        return max(wait, 0)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                wait = self.run_once()
+            except Exception:
+                # e.g. the database is locked: retry on the next poll
+                logger.exception("Reminder scheduler failed")
+                self.stats['errors'] += 1
+                self._next_load = 0
+                wait = self.poll_seconds
+            self._stop.wait(wait)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['pending'] = len(self._pending)
+        stats['running'] = self._thread is not None and self._thread.is_alive()
+        return stats
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def start_reminder_scheduler():
+    # One scheduler per process, started on the first call (main.py calls
+    # this on every rerun). None when reminders are off in the storage config.
+    global _scheduler
+    if not STORAGE_CONFIG['reminders']:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ReminderScheduler()
+        _scheduler.start()
+    return _scheduler
+
+def get_reminder_stats():
+    if _scheduler is None:
+        return {'running': False}
+    return _scheduler.get_stats()
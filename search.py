@@ -0,0 +1,93 @@
+import re
+from database import get_db_connection
+
+# tasks_fts (words) and tasks_trigram (substrings of title and tags) are
+# external-content FTS5 indexes over the tasks table keyed by its rowid. Tasks
+# have a TEXT primary key, so a VACUUM may renumber rowids: run
+# rebuild_search_index() after vacuuming the database.
+SEARCH_INDEXES = ['tasks_fts', 'tasks_trigram']
+
+# The trigram tokenizer cannot match fragments shorter than this
+MIN_TRIGRAM_LENGTH = 3
+
+# Columns of the search_hits table joined by task queries
+SEARCH_RANK_SQL = "search_hits.search_rank"
+SEARCH_SNIPPET_SQL = "search_hits.search_snippet"
+
+def to_fts_query(text):
+    # Every word of the search box must match, each as a prefix ("rep" finds
+    # "report"). Words are quoted so user input can never be FTS5 syntax.
+    words = re.findall(r"\w+", text or "")
+    return " ".join(f'"{word}"*' for word in words)
+
+def to_trigram_query(text):
+    # The whole input as one quoted phrase: a case-insensitive substring match
+    text = (text or "").strip()
+    if len(text) < MIN_TRIGRAM_LENGTH:
+        return ""
+    return '"' + text.replace('"', '""') + '"'
+
+def search_hits_sql(text):
+    # Derived table of (rowid, search_rank, search_snippet) for a search box
+    # input, or (None, []) if neither index can answer it. Word matches are
+    # ranked by bm25 (title and tags weighted above description and notes);
+    # substring-only matches rank after them with the fragment highlighted.
+    branches = []
+    params = []
+    
+    word_query = to_fts_query(text)
+    if word_query:
+        branches.append("""
+        SELECT rowid, bm25(tasks_fts, 10.0, 1.0, 1.0, 5.0) AS search_rank,
+               snippet(tasks_fts, -1, '**', '**', '...', 12) AS search_snippet
+        FROM tasks_fts WHERE tasks_fts MATCH ?
+        """)
+        params.append(word_query)
+    
+    fragment_query = to_trigram_query(text)
+    if fragment_query:
+        branches.append("""
+        SELECT rowid, 0.0, highlight(tasks_trigram, 0, '**', '**')
+        FROM tasks_trigram WHERE tasks_trigram MATCH ?
+        """)
+        params.append(fragment_query)
+    
+    if not branches:
+        return None, []
+    
+    # A task found by both keeps its best rank (and that row's snippet)
+    sql = f"""
+    SELECT rowid, MIN(search_rank) AS search_rank, search_snippet
+    FROM ({" UNION ALL ".join(branches)})
+    GROUP BY rowid
+    """
+    return sql, params
+
+def rebuild_search_index():
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        for index in SEARCH_INDEXES:
+            cursor.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+        
+        conn.commit()
+        conn.close()
+        return True, "Search index rebuilt successfully"
+    except Exception as e:
+        return False, f"Error rebuilding search index: {str(e)}"
+
+def optimize_search_index():
+    # Merge the index segments after large imports or restores
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        for index in SEARCH_INDEXES:
+            cursor.execute(f"INSERT INTO {index} ({index}) VALUES ('optimize')")
+        
+        conn.commit()
+        conn.close()
+        return True, "Search index optimized successfully"
+    except Exception as e:
+        return False, f"Error optimizing search index: {str(e)}"
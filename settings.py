@@ -2,7 +2,9 @@ import uuid
 import hashlib
 import streamlit as st
 from database import get_db_connection
+from cache import cached, skip_cache, bump_data_version
 
+@cached
 def get_user_settings(user_id):
     try:
         conn = get_db_connection()
@@ -23,6 +25,7 @@ def get_user_settings(user_id):
         return settings
     except Exception as e:
         st.error(f"Error fetching settings: {str(e)}")
+        skip_cache()
         return {}
 
 def update_user_settings(user_id, settings):
@@ -54,6 +57,7 @@ def update_user_settings(user_id, settings):
         
         conn.commit()
         conn.close()
+        bump_data_version(user_id)
         return True, "Settings updated successfully"
     except Exception as e:
         return False, f"Error updating settings: {str(e)}"
@@ -0,0 +1,117 @@
+import json
+import os
+
+# Named PRAGMA profiles applied to every SQLite connection
+PROFILES = {
+    # Safe defaults for a single local user
+    'dev': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'mmap_size': 0,
+        'cache_size': -2000,  # KiB when negative
+        'busy_timeout': 5000,  # milliseconds
+        'temp_store': 'DEFAULT'
+    },
+    # Many concurrent Streamlit sessions: readers never block the writer
+    'high-concurrency': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,
+        'busy_timeout': 15000,
+        'temp_store': 'MEMORY'
+    },
+    # Imports and restores: durability traded for throughput
+    'bulk-load': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'mmap_size': 512 * 1024 * 1024,
+        'cache_size': -256000,
+        'busy_timeout': 60000,
+        'temp_store': 'MEMORY'
+    }
+}
+
+DEFAULT_CONFIG = {
+    'db_path': 'task_manager.db',
+    'profile': 'high-concurrency',
+    'pool_size': 5,
+    # In-process bitmap index for View Tasks facet filters and counts
+    'facet_index': False,
+    # Query result cache: seconds an entry lives (0 disables it) and its size
+    'cache_ttl': 300,
+    'cache_max_entries': 1000,
+    # Background thread turning tasks' reminder settings into notifications
+    'reminders': True
+}
+
+CONFIG_FILE = 'storage.json'
+ENV_PREFIX = 'TASK_MANAGER_DB_'
+
+JOURNAL_MODES = ['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF']
+SYNCHRONOUS_LEVELS = ['OFF', 'NORMAL', 'FULL', 'EXTRA']
+TEMP_STORES = ['DEFAULT', 'FILE', 'MEMORY']
+PRAGMA_KEYS = ['journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'busy_timeout', 'temp_store']
+INT_KEYS = ['mmap_size', 'cache_size', 'busy_timeout', 'pool_size', 'cache_ttl', 'cache_max_entries']
+BOOL_KEYS = ['facet_index', 'reminders']
+
+def validate_storage_config(config):
+    if config['profile'] not in PROFILES:
+        raise ValueError(f"Unknown storage profile: {config['profile']}")
+
+    for key in INT_KEYS:
+        config[key] = int(config[key])
+
+    # Environment values arrive as strings, e.g. TASK_MANAGER_DB_FACET_INDEX=1
+    for key in BOOL_KEYS:
+        if isinstance(config[key], str):
+            config[key] = config[key].strip().lower() in ['1', 'true', 'yes', 'on']
+        config[key] = bool(config[key])
+
+    config['journal_mode'] = config['journal_mode'].upper()
+    config['synchronous'] = str(config['synchronous']).upper()
+    config['temp_store'] = config['temp_store'].upper()
+
+    if config['journal_mode'] not in JOURNAL_MODES:
+        raise ValueError(f"Invalid journal_mode: {config['journal_mode']}")
+    if config['synchronous'] not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Invalid synchronous level: {config['synchronous']}")
+    if config['temp_store'] not in TEMP_STORES:
+        raise ValueError(f"Invalid temp_store: {config['temp_store']}")
+
+    return config
+
+def load_storage_config(config_file=None, environ=None):
+    # Precedence: built-in defaults < profile < config file < environment
+    environ = os.environ if environ is None else environ
+    config_file = config_file or environ.get(f"{ENV_PREFIX}CONFIG", CONFIG_FILE)
+
+    overrides = {}
+    if os.path.exists(config_file):
+        with open(config_file, 'r') as f:
+            overrides.update(json.load(f))
+
+    for key in list(DEFAULT_CONFIG) + PRAGMA_KEYS:
+        # e.g. TASK_MANAGER_DB_PATH, TASK_MANAGER_DB_PROFILE, TASK_MANAGER_DB_JOURNAL_MODE
+        env_name = key[len('db_'):] if key.startswith('db_') else key
+        env_value = environ.get(f"{ENV_PREFIX}{env_name.upper()}")
+        if env_value is not None:
+            overrides[key] = env_value
+
+    profile = overrides.get('profile', DEFAULT_CONFIG['profile'])
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown storage profile: {profile}")
+
+    config = dict(DEFAULT_CONFIG)
+    config.update(PROFILES[profile])
+    config.update(overrides)
+    return validate_storage_config(config)
+
+def apply_pragmas(conn, config):
+    # Values are validated in load_storage_config, so they are safe to inline
+    conn.execute(f"PRAGMA busy_timeout = {int(config['busy_timeout'])}")
+    conn.execute(f"PRAGMA journal_mode = {config['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {config['synchronous']}")
+    conn.execute(f"PRAGMA mmap_size = {int(config['mmap_size'])}")
+    conn.execute(f"PRAGMA cache_size = {int(config['cache_size'])}")
+    conn.execute(f"PRAGMA temp_store = {config['temp_store']}")
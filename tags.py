@@ -0,0 +1,111 @@
+import streamlit as st
+from database import get_db_connection
+from migrations import TAG_BACKFILL_SQL
+from cache import cached, skip_cache
+
+def parse_tags(tags):
+    # "work, Home,work" -> ["work", "Home"]: trimmed, no blanks and no
+    # case-insensitive duplicates (same rules as the migration backfill)
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    
+    names = {}
+    for tag in tags:
+        tag = tag.strip()
+        if tag and tag.lower() not in names:
+            names[tag.lower()] = tag
+    return list(names.values())
+
+def set_task_tags(cursor, task_tags):
+    # Replace the tag rows of each (task_id, tags) pair; runs inside the
+    # caller's transaction so tags always match the tasks.tags column
+    task_tags = [(task_id, parse_tags(tags)) for task_id, tags in task_tags]
+    if not task_tags:
+        return
+    
+    placeholders = ", ".join(["?"] * len(task_tags))
+    cursor.execute(
+        f"DELETE FROM task_tags WHERE task_id IN ({placeholders})",
+        [task_id for task_id, _ in task_tags]
+    )
+    
+    rows = [(task_id, name) for task_id, names in task_tags for name in names]
+    if not rows:
+        return
+    
+    cursor.executemany(
+        "INSERT OR IGNORE INTO tags (name) VALUES (?)",
+        [(name,) for name in {name.lower(): name for _, name in rows}.values()]
+    )
+    cursor.executemany('''
+    INSERT OR IGNORE INTO task_tags (task_id, tag_id)
+    SELECT ?, id FROM tags WHERE name = ?
+    ''', rows)
+
+def tag_filter_condition(tags, match="any"):
+    # SQL condition (and params) selecting tasks tagged with any/all of `tags`
+    names = parse_tags(tags)
+    if not names:
+        return None, []
+    
+    placeholders = ", ".join(["?"] * len(names))
+    subquery = f"""
+    SELECT task_tags.task_id FROM task_tags
+    JOIN tags ON tags.id = task_tags.tag_id
+    WHERE tags.name IN ({placeholders})
+    """
+    params = list(names)
+    if match == "all":
+        subquery += " GROUP BY task_tags.task_id HAVING COUNT(*) = ?"
+        params.append(len(names))
+    
+    return f"tasks.id IN ({subquery})", params
+
+@cached
+def get_tag_counts(user_id, prefix="", limit=20):
+    # The user's most used tags starting with `prefix`, for autocomplete.
+    # Counted over the tasks the user can see (the two arms don't overlap),
+    # so other users' tags never show up: one task_tags primary key range
+    # per task of the user.
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        cursor.execute('''
+        SELECT tags.name, COUNT(*) AS task_count FROM task_tags
+        JOIN tags ON tags.id = task_tags.tag_id
+        WHERE task_tags.task_id IN (
+            SELECT id FROM tasks WHERE assigned_to = ?
+            UNION ALL
+            SELECT id FROM tasks WHERE assigned_by = ? AND assigned_to IS NOT assigned_by
+        ) AND tags.name LIKE ? ESCAPE '\\'
+        GROUP BY tags.id
+        ORDER BY task_count DESC, tags.name
+        LIMIT ?
+        ''', (user_id, user_id, f"{escaped}%", limit))
+        counts = [(row['name'], row['task_count']) for row in cursor.fetchall()]
+        
+        conn.close()
+        return counts
+    except Exception as e:
+        st.error(f"Error fetching tags: {str(e)}")
+        skip_cache()
+        return []
+
+def rebuild_tag_index():
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM task_tags")
+        for statement in TAG_BACKFILL_SQL:
+            cursor.execute(statement)
+        
+        conn.commit()
+        conn.close()
+        return True, "Tag index rebuilt successfully"
+    except Exception as e:
+        return False, f"Error rebuilding tag index: {str(e)}"
@@ -2,168 +2,782 @@ import uuid
 from datetime import datetime, timedelta
 import streamlit as st
 from database import get_db_connection
+from counters import get_task_counters, get_daily_rollup
+from recurrence import build_rrule, expand_series, occurrence_dates, occurrence_count, make_virtual_id, is_virtual_id, split_virtual_id
+from search import search_hits_sql, SEARCH_RANK_SQL, SEARCH_SNIPPET_SQL
+from tags import parse_tags, set_task_tags, tag_filter_condition
+from facets import get_facet_index, refresh_facets, rowid_bitmap, FACETS
+from cache import cached, skip_cache, bump_data_version
+from migrations import GRID_SORT_COLUMNS, arm_series_reminders
 
-def add_task(task_data):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+# Days of history shown by the trend charts
+TREND_DAYS = 90
+
+TASK_PRIORITIES = ["Low", "Medium", "High"]
+TASK_STATUSES = ["Pending", "In Progress", "Completed"]
+RECURRENCE_OPTIONS = ["None", "Daily", "Weekly", "Monthly", "Yearly"]
+
+# Rows per transaction for bulk inserts
+BULK_CHUNK_SIZE = 500
+
+# Every column add_tasks writes, in INSERT order
+TASK_INSERT_COLUMNS = [
+    'id', 'title', 'description', 'priority', 'status', 'due_date',
+    'created_date', 'modified_date', 'assigned_by', 'assigned_to',
+    'tags', 'recurring', 'recurrence_end_date', 'reminder', 'time_estimate', 'time_spent', 'notes',
+    'completed_date', 'rrule', 'series_id', 'occurrence_date'
+]
+
+def _validate_task(task_data):
+    if not task_data.get('title'):
+        return "Title is required"
+    if task_data.get('priority') not in TASK_PRIORITIES:
+        return f"Invalid priority: {task_data.get('priority')}"
+    if task_data.get('status') not in TASK_STATUSES:
+        return f"Invalid status: {task_data.get('status')}"
+    if task_data.get('recurring', 'None') not in RECURRENCE_OPTIONS:
+        return f"Invalid recurrence: {task_data.get('recurring')}"
+    for key in ['due_date', 'recurrence_end_date']:
+        if task_data.get(key):
+            try:
+                datetime.strptime(task_data[key], "%Y-%m-%d")
+            except (TypeError, ValueError):
+                return f"Invalid {key}: {task_data[key]}"
+    return None
+
+def _task_row(task_data, user_id, now):
+    row = {
+        'id': str(uuid.uuid4()),
+        'description': '',
+        'due_date': None,
+        'created_date': now,
+        'modified_date': now,
+        'assigned_by': user_id,
+        'tags': '',
+        'recurring': 'None',
+        'recurrence_end_date': None,
+        'reminder': None,
+        'time_estimate': 0,
+        'time_spent': 0,
+        'notes': '',
+        'completed_date': None,
+        'series_id': None,
+        'occurrence_date': None
+    }
+    row.update({key: value for key, value in task_data.items() if key in TASK_INSERT_COLUMNS})
+    row['assigned_to'] = row.get('assigned_to') or user_id
+    
+    if row['status'] == 'Completed' and not row['completed_date']:
+        row['completed_date'] = now
+    
+    # Recurring tasks are stored once as a series; occurrences are expanded on read
+    if 'rrule' not in task_data:
+        row['rrule'] = build_rrule(row['recurring'], row['recurrence_end_date'])
+    
+    return tuple(row[column] for column in TASK_INSERT_COLUMNS)
+
+def _insert_task_chunk(cursor, chunk):
+    columns = ", ".join(TASK_INSERT_COLUMNS)
+    placeholders = ", ".join(["?"] * len(TASK_INSERT_COLUMNS))
+    cursor.executemany(
+        f"INSERT INTO tasks ({columns}) VALUES ({placeholders})",
+        [row for _, row, _ in chunk]
+    )
+    tags_index = TASK_INSERT_COLUMNS.index('tags')
+    set_task_tags(cursor, [(row[0], row[tags_index]) for _, row, _ in chunk])
+    rrule_index = TASK_INSERT_COLUMNS.index('rrule')
+    arm_series_reminders(cursor, [row[0] for _, row, _ in chunk if row[rrule_index]])
+    cursor.executemany('''
+    INSERT INTO notifications (id, user_id, task_id, message, created_at)
+    VALUES (?, ?, ?, ?, ?)
+    ''', [notification for _, _, notification in chunk if notification])
+
+def add_tasks(batch, user_id=None, notify=True, chunk_size=BULK_CHUNK_SIZE):
+    # Validate and insert many tasks (and their assignment notifications) with
+    # executemany, one transaction per chunk. Returns the new ids in batch
+    # order (None where a row failed) and a list of per-row errors.
+    user_id = user_id or st.session_state.get('user_id')
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    task_ids = [None] * len(batch)
+    errors = []
+    
+    rows = []
+    for index, task_data in enumerate(batch):
+        error = _validate_task(task_data)
+        if error:
+            errors.append({'index': index, 'error': error})
+            continue
         
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        task_id = str(uuid.uuid4())
-        
-        cursor.execute('''
-        INSERT INTO tasks (
-            id, title, description, priority, status, due_date, 
-            created_date, modified_date, assigned_by, assigned_to, 
-            tags, recurring, recurrence_end_date, reminder, time_estimate, notes
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            task_id, 
-            task_data['title'], 
-            task_data.get('description', ''),
-            task_data['priority'],
-            task_data['status'],
-            task_data.get('due_date', None),
-            now,
-            now,
-            task_data.get('assigned_by', st.session_state.user_id),
-            task_data.get('assigned_to', st.session_state.user_id),
-            task_data.get('tags', ''),
-            task_data.get('recurring', 'None'),
-            task_data.get('recurrence_end_date', None),
-            task_data.get('reminder', None),
-            task_data.get('time_estimate', 0),
-            task_data.get('notes', '')
-        ))
+        row = _task_row(task_data, user_id, now)
+        task_id = row[0]
+        assigned_to = row[TASK_INSERT_COLUMNS.index('assigned_to')]
         
         # If task is assigned to someone else, create notification
-        if task_data.get('assigned_to') != st.session_state.user_id:
-            notification_id = str(uuid.uuid4())
+        notification = None
+        if notify and assigned_to != user_id:
             message = f"You have been assigned a new task: {task_data['title']}"
-            
-            cursor.execute('''
-            INSERT INTO notifications (id, user_id, task_id, message, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (
-                notification_id,
-                task_data.get('assigned_to'),
-                task_id,
-                message,
-                now
-            ))
+            notification = (str(uuid.uuid4()), assigned_to, task_id, message, now)
         
-        conn.commit()
-        conn.close()
+        rows.append((index, row, notification))
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            _insert_task_chunk(cursor, chunk)
+            conn.commit()
+            for index, row, _ in chunk:
+                task_ids[index] = row[0]
+        except Exception:
+            conn.rollback()
+            # Retry row by row so one bad row does not sink the whole chunk
+            for item in chunk:
+                try:
+                    _insert_task_chunk(cursor, [item])
+                    conn.commit()
+                    task_ids[item[0]] = item[1][0]
+                except Exception as e:
+                    conn.rollback()
+                    errors.append({'index': item[0], 'error': str(e)})
+    
+    conn.close()
+    refresh_facets(task_ids)
+    
+    # Cached reads of everyone the new tasks belong to are out of date
+    assigned_to_index = TASK_INSERT_COLUMNS.index('assigned_to')
+    assigned_by_index = TASK_INSERT_COLUMNS.index('assigned_by')
+    bump_data_version(*[row[index] for _, row, _ in rows for index in (assigned_to_index, assigned_by_index)])
+    
+    errors.sort(key=lambda error: error['index'])
+    return task_ids, errors
+
+def add_task(task_data):
+    try:
+        task_ids, errors = add_tasks([task_data])
         
-        # Handle recurring tasks
-        if task_data.get('recurring', 'None') != 'None':
-            create_recurring_tasks(task_id, task_data)
+        if errors:
+            return False, f"Error adding task: {errors[0]['error']}", None
         
-        return True, "Task added successfully", task_id
+        return True, "Task added successfully", task_ids[0]
     except Exception as e:
         return False, f"Error adding task: {str(e)}", None
 
+# Columns View Tasks can sort by; "relevance" only applies to a search
+RELEVANCE = "relevance"
+SORT_COLUMNS = ["due_date", "priority", "status", "title", "created_date", "modified_date", RELEVANCE]
+
+def _search_hits(filters):
+    return search_hits_sql(filters.get('search')) if filters else (None, [])
+
+def _build_task_query(user_id=None, filters=None, columns=None):
+    # Resolve assignee names in the same query instead of one lookup per task
+    search_hits, search_params = _search_hits(filters)
+    if columns is None:
+        columns = "tasks.*, users.username AS assigned_to_username"
+        if search_hits:
+            columns += f", {SEARCH_RANK_SQL} AS search_rank, {SEARCH_SNIPPET_SQL} AS search_snippet"
+    
+    query = f"""
+    SELECT {columns}
+    FROM tasks
+    LEFT JOIN users ON users.id = tasks.assigned_to
+    """
+    params = []
+    conditions = []
+    
+    # Searches are answered by the word and substring indexes, whose hits
+    # drive the join (rowid lookups) instead of a scan of tasks
+    if search_hits:
+        query += f"JOIN ({search_hits}) AS search_hits ON search_hits.rowid = tasks.rowid\n"
+        params.extend(search_params)
+    
+    if user_id:
+        conditions.append("(tasks.assigned_to = ? OR tasks.assigned_by = ?)")
+        params.extend([user_id, user_id])
+    
+    if filters:
+        if 'status' in filters:
+            conditions.append("tasks.status = ?")
+            params.append(filters['status'])
+        
+        if 'priority' in filters:
+            conditions.append("tasks.priority = ?")
+            params.append(filters['priority'])
+        
+        if 'assigned_to' in filters:
+            conditions.append("tasks.assigned_to = ?")
+            params.append(filters['assigned_to'])
+        
+        if 'due_date' in filters:
+            conditions.append("tasks.due_date = ?")
+            params.append(filters['due_date'])
+        
+        # Due date ranges (YYYY-MM-DD, before/after exclusive, between inclusive)
+        # are index range scans; the > '' bound skips tasks without a due date
+        if 'due_before' in filters:
+            conditions.append("tasks.due_date > '' AND tasks.due_date < ?")
+            params.append(filters['due_before'])
+        
+        if 'due_after' in filters:
+            conditions.append("tasks.due_date > ?")
+            params.append(filters['due_after'])
+        
+        if 'due_between' in filters:
+            conditions.append("tasks.due_date BETWEEN ? AND ?")
+            params.extend(filters['due_between'])
+        
+        # Exact tags through the tag index; tag_match is "any" (OR) or "all" (AND)
+        if 'tags' in filters:
+            condition, tag_params = tag_filter_condition(filters['tags'], filters.get('tag_match', 'any'))
+            if condition:
+                conditions.append(condition)
+                params.extend(tag_params)
+        
+        # Input too short for either index (e.g. a single symbol) is scanned
+        if 'search' in filters and not search_hits:
+            search_term = f"%{filters['search']}%"
+            conditions.append("(tasks.title LIKE ? OR tasks.description LIKE ? OR tasks.tags LIKE ?)")
+            params.extend([search_term, search_term, search_term])
+    
+    return query, conditions, params
+
+DUE_FILTERS = ['due_date', 'due_before', 'due_after', 'due_between']
+
+def _due_window(filters):
+    # The inclusive (start, end) due date range allowed by the due filters
+    starts = []
+    ends = []
+    if 'due_date' in filters:
+        starts.append(filters['due_date'])
+        ends.append(filters['due_date'])
+    if 'due_before' in filters:
+        due_before = datetime.strptime(filters['due_before'], "%Y-%m-%d").date()
+        ends.append((due_before - timedelta(days=1)).isoformat())
+    if 'due_after' in filters:
+        due_after = datetime.strptime(filters['due_after'], "%Y-%m-%d").date()
+        starts.append((due_after + timedelta(days=1)).isoformat())
+    if 'due_between' in filters:
+        starts.append(filters['due_between'][0])
+        ends.append(filters['due_between'][1])
+    return max(starts, default=None), min(ends, default=None)
+
+# The user's series rowids, read from the small partial rrule indexes. Without
+# ANALYZE statistics the planner would rather use a full (assigned_to, ...)
+# index for the user scope and visit every task of the user.
+SERIES_SCOPE_SQL = """tasks.rowid IN (
+    SELECT rowid FROM tasks INDEXED BY idx_tasks_rrule_assigned_to WHERE assigned_to = ? AND rrule IS NOT NULL
+    UNION
+    SELECT rowid FROM tasks INDEXED BY idx_tasks_rrule_assigned_by WHERE assigned_by = ? AND rrule IS NOT NULL
+)"""
+
+def _recurring_series(cursor, user_id=None, filters=None):
+    # The recurring series visible to the user that match the filters, the
+    # dates of their occurrences that are not virtual any more (persisted or
+    # deleted) and the (start, end) due date window of the filters. Virtual
+    # occurrences are always Pending, so status and due date filters apply
+    # per occurrence while every other filter applies to the series row.
+    filters = filters or {}
+    if filters.get('status', 'Pending') != 'Pending':
+        return [], {}, (None, None)
+    
+    window_start, window_end = _due_window(filters)
+    if window_start and window_end and window_start > window_end:
+        return [], {}, (None, None)
+    
+    series_filters = {k: v for k, v in filters.items() if k != 'status' and k not in DUE_FILTERS}
+    query, conditions, params = _build_task_query(None, series_filters)
+    conditions.append("tasks.rrule IS NOT NULL")
+    if user_id:
+        conditions.append(SERIES_SCOPE_SQL)
+        params.extend([user_id, user_id])
+    query += " WHERE " + " AND ".join(conditions)
+    
+    cursor.execute(query, params)
+    series_rows = [dict(row) for row in cursor.fetchall() if row['due_date']]
+    if not series_rows:
+        return [], {}, (None, None)
+    
+    series_ids = [series['id'] for series in series_rows]
+    placeholders = ", ".join(["?"] * len(series_ids))
+    cursor.execute(f"""
+    SELECT series_id, occurrence_date FROM tasks WHERE series_id IN ({placeholders})
+    UNION ALL
+    SELECT series_id, occurrence_date FROM task_series_exceptions WHERE series_id IN ({placeholders})
+    """, series_ids + series_ids)
+    touched = {}
+    for row in cursor.fetchall():
+        touched.setdefault(row['series_id'], set()).add(row['occurrence_date'])
+    
+    return series_rows, touched, (window_start, window_end)
+
+def _narrow_window(window, bounds):
+    # Intersection of two (start, end) due date ranges; None ends are open
+    starts = [day for day in (window[0], bounds[0]) if day]
+    ends = [day for day in (window[1], bounds[1]) if day]
+    return max(starts, default=None), min(ends, default=None)
+
+def _virtual_tasks(cursor, user_id=None, filters=None, limit=None, reverse=False, series_window=None):
+    # Untouched occurrences of the recurring series visible to the user. With
+    # `limit`, only the first (or with `reverse` the last) `limit` of each
+    # series; series_window(series) can narrow a series to a due date range
+    # or drop it (None), so a page never expands more than it can show.
+    series_rows, touched, window = _recurring_series(cursor, user_id, filters)
+    tasks = []
+    for series in series_rows:
+        series_range = window
+        if series_window is not None:
+            bounds = series_window(series)
+            if bounds is None:
+                continue
+            series_range = _narrow_window(window, bounds)
+        tasks.extend(expand_series(
+            series, series_range[0], series_range[1], touched.get(series['id'], ()), limit, reverse
+        ))
+    return tasks
+
+def _virtual_task_count(series_rows, touched, window):
+    # Occurrences counted from the rules, without expanding them
+    return sum(
+        occurrence_count(series['rrule'], series['due_date'], window[0], window[1], touched.get(series['id'], ()))
+        for series in series_rows
+    )
+
+def _set_assignee_names(tasks, user_id):
+    for task in tasks:
+        username = task.pop('assigned_to_username')
+        if task['assigned_to'] != user_id:
+            task['assigned_to_name'] = username or "Unknown"
+        else:
+            task['assigned_to_name'] = "You"
+    return tasks
+
+@cached
 def get_tasks(user_id=None, filters=None, sort_by=None, sort_order="asc"):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        query = "SELECT * FROM tasks"
-        params = []
-        
         # Apply filters
-        if filters or user_id:
-            query += " WHERE "
-            conditions = []
-            
-            if user_id:
-                conditions.append("(assigned_to = ? OR assigned_by = ?)")
-                params.extend([user_id, user_id])
-            
-            if filters:
-                if 'status' in filters:
-                    conditions.append("status = ?")
-                    params.append(filters['status'])
-                
-                if 'priority' in filters:
-                    conditions.append("priority = ?")
-                    params.append(filters['priority'])
-                
-                if 'due_date' in filters:
-                    conditions.append("due_date = ?")
-                    params.append(filters['due_date'])
-                
-                if 'tags' in filters:
-                    conditions.append("tags LIKE ?")
-                    params.append(f"%{filters['tags']}%")
-                
-                if 'search' in filters:
-                    search_term = f"%{filters['search']}%"
-                    conditions.append("(title LIKE ? OR description LIKE ? OR tags LIKE ?)")
-                    params.extend([search_term, search_term, search_term])
-            
-            query += " AND ".join(conditions)
+        query, conditions, params = _build_task_query(user_id, filters)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
         
-        # Apply sorting
-        if sort_by:
-            query += f" ORDER BY {sort_by} "
+        # Searches are ranked by relevance unless another order is asked for
+        if _search_hits(filters)[0] and sort_by in (None, RELEVANCE):
+            sort_by, sort_order = 'search_rank', "asc"
+            query += " ORDER BY search_rank ASC"
+        elif sort_by and sort_by != RELEVANCE:
+            query += f" ORDER BY tasks.{sort_by} "
             if sort_order.lower() == "desc":
                 query += "DESC"
             else:
                 query += "ASC"
         else:
             # Default sort by due date
-            query += " ORDER BY due_date ASC"
+            sort_by = 'due_date'
+            query += " ORDER BY tasks.due_date ASC"
         
         cursor.execute(query, params)
         tasks = [dict(row) for row in cursor.fetchall()]
         
-        # Get assigned user details
-        for task in tasks:
-            if task['assigned_to'] != user_id:
-                cursor.execute("SELECT username FROM users WHERE id = ?", (task['assigned_to'],))
-                user = cursor.fetchone()
-                if user:
-                    task['assigned_to_name'] = user['username']
-                else:
-                    task['assigned_to_name'] = "Unknown"
-            else:
-                task['assigned_to_name'] = "You"
+        # Merge in the occurrences of recurring series
+        virtual_tasks = _virtual_tasks(cursor, user_id, filters)
+        if virtual_tasks:
+            sort_column = sort_by
+            tasks.extend(virtual_tasks)
+            tasks.sort(
+                key=lambda t: (t[sort_column] is not None, t[sort_column] or ''),
+                reverse=sort_order.lower() == "desc"
+            )
+        
+        tasks = _set_assignee_names(tasks, user_id)
         
         conn.close()
         return tasks
     except Exception as e:
         st.error(f"Error fetching tasks: {str(e)}")
+        skip_cache()
         return []
 
-def update_task(task_id, updates):
+def get_task_by_id(task_id, user_id=None):
+    # One task as get_tasks returns it (virtual occurrences included), or None.
+    # With user_id, only a task assigned to or by that user.
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Get current task details
-        cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        current_task = cursor.fetchone()
+        series_id, occurrence_date = split_virtual_id(task_id) if is_virtual_id(task_id) else (task_id, None)
+        query, conditions, params = _build_task_query(user_id)
+        conditions.append("tasks.id = ?")
+        params.append(series_id)
+        cursor.execute(query + " WHERE " + " AND ".join(conditions), params)
+        row = cursor.fetchone()
+        task = dict(row) if row else None
         
-        if not current_task:
-            conn.close()
-            return False, "Task not found"
+        if task and occurrence_date:
+            # Occurrences that were persisted or deleted are not virtual any more
+            cursor.execute("""
+            SELECT 1 FROM tasks WHERE series_id = ? AND occurrence_date = ?
+            UNION ALL
+            SELECT 1 FROM task_series_exceptions WHERE series_id = ? AND occurrence_date = ?
+            """, (series_id, occurrence_date, series_id, occurrence_date))
+            touched = cursor.fetchone() is not None
+            occurrences = [] if touched else expand_series(task, occurrence_date, occurrence_date)
+            task = occurrences[0] if occurrences else None
+        
+        conn.close()
+        return _set_assignee_names([task], user_id)[0] if task else None
+    except Exception as e:
+        st.error(f"Error fetching task: {str(e)}")
+        return None
+
+# The two halves of the get_tasks user scope: tasks assigned to the user and
+# tasks they assigned to someone else (each task lands in exactly one). The
+# second compares the two columns, not the parameter, so it matches the
+# partial grid index of delegated tasks (migrations.GRID_SCOPES).
+USER_SCOPES = [
+    ("tasks.assigned_to = ?", 1),
+    ("tasks.assigned_by = ? AND tasks.assigned_to IS NOT tasks.assigned_by", 1)
+]
+
+def _scoped_page_query(user_id, filters, sort_key, direction, page_conditions, page_params, limit):
+    # `(assigned_to = ? OR assigned_by = ?) ORDER BY ...` sorts every task of the
+    # user before the LIMIT applies. Each half of the scope instead walks its
+    # (scope, sort key, id) grid index and stops after `limit` rows, so a page
+    # costs the same for 50 tasks or 50,000; the outer query merges two pages.
+    arms = []
+    params = []
+    for scope_condition, scope_placeholders in USER_SCOPES:
+        query, conditions, arm_params = _build_task_query(
+            None,
+            filters,
+            columns=f"tasks.*, users.username AS assigned_to_username, {sort_key} AS page_sort_key"
+        )
+        conditions = [scope_condition] + conditions + page_conditions
+        arms.append(f"""
+        SELECT * FROM ({query} WHERE {" AND ".join(conditions)}
+        ORDER BY {sort_key} {direction}, tasks.id {direction} LIMIT ?)
+        """)
+        params.extend([user_id] * scope_placeholders + arm_params + page_params + [limit])
+    
+    query = " UNION ALL ".join(arms) + f" ORDER BY page_sort_key {direction}, id {direction} LIMIT ?"
+    params.append(limit)
+    return query, params
+
+def _cursor_window(series, sort_by, direction, cursor):
+    # The due dates of the series' occurrences that come after `cursor` in
+    # page order, as a (start, end) range, or None when none do. Within one
+    # series the page key (sort value, "<series id>@<date>") grows with the
+    # due date, so they always form a single range; the bound itself is
+    # re-checked against the cursor when the page is merged.
+    if cursor is None:
+        return None, None
+    cursor_value, cursor_id = cursor
+    descending = direction == "DESC"
+    
+    if sort_by == 'due_date':
+        # Tasks without a due date sort first (as '')
+        if descending:
+            return (None, cursor_value) if cursor_value else None
+        return cursor_value or None, None
+    
+    value = '' if series[sort_by] is None else series[sort_by]
+    if value != cursor_value:
+        return (None, None) if (value < cursor_value) == descending else None
+    prefix = make_virtual_id(series['id'], '')
+    if cursor_id.startswith(prefix):
+        day = cursor_id[len(prefix):]
+        return (None, day) if descending else (day, None)
+    return (None, None) if (cursor_id > prefix) == descending else None
+
+@cached
+def get_tasks_page(user_id=None, filters=None, sort_by="due_date", sort_order="asc", cursor=None, page_size=50):
+    # Keyset pagination: `cursor` is the (sort value, id) of the last task of the
+    # previous page, so every page is an index range scan instead of an OFFSET
+    try:
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort_by}")
+        
+        conn = get_db_connection()
+        db_cursor = conn.cursor()
+        
+        search_hits = _search_hits(filters)[0]
+        if sort_by == RELEVANCE:
+            # Best matches first; without a search there is nothing to rank
+            if search_hits:
+                sort_by, sort_key, sort_order = 'search_rank', SEARCH_RANK_SQL, "asc"
+            else:
+                sort_by, sort_key = 'due_date', "IFNULL(tasks.due_date, '')"
+        else:
+            # NULLs sort as empty strings so they have a stable position in the keyset
+            sort_key = f"IFNULL(tasks.{sort_by}, '')"
+        direction = "DESC" if sort_order.lower() == "desc" else "ASC"
+        
+        page_conditions = []
+        page_params = []
+        if cursor is not None:
+            comparison = "<" if direction == "DESC" else ">"
+            page_conditions.append(f"({sort_key}, tasks.id) {comparison} (?, ?)")
+            page_params.extend([cursor[0], cursor[1]])
+        
+        # Fetch one extra row to know whether there is a next page
+        if user_id and not search_hits and sort_by in GRID_SORT_COLUMNS:
+            query, params = _scoped_page_query(user_id, filters, sort_key, direction, page_conditions, page_params, page_size + 1)
+        else:
+            query, conditions, params = _build_task_query(user_id, filters)
+            conditions += page_conditions
+            params += page_params
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += f" ORDER BY {sort_key} {direction}, tasks.id {direction} LIMIT ?"
+            params.append(page_size + 1)
+        
+        db_cursor.execute(query, params)
+        tasks = [dict(row) for row in db_cursor.fetchall()]
+        for task in tasks:
+            task.pop('page_sort_key', None)
+        
+        # Merge in the occurrences of recurring series that belong on this page:
+        # per series, at most a page of them past the cursor (plus the one on
+        # the cursor's own date, which may still sort before the cursor)
+        virtual_tasks = _virtual_tasks(
+            db_cursor,
+            user_id,
+            filters,
+            limit=page_size + 2,
+            reverse=direction == "DESC",
+            series_window=lambda series: _cursor_window(series, sort_by, direction, cursor)
+        )
+        conn.close()
+        
+        if virtual_tasks:
+            page_key = lambda t: ('' if t[sort_by] is None else t[sort_by], t['id'])
+            if cursor is not None:
+                cursor_key = (cursor[0], cursor[1])
+                if direction == "DESC":
+                    virtual_tasks = [t for t in virtual_tasks if page_key(t) < cursor_key]
+                else:
+                    virtual_tasks = [t for t in virtual_tasks if page_key(t) > cursor_key]
+            tasks.extend(virtual_tasks)
+            tasks.sort(key=page_key, reverse=direction == "DESC")
+        
+        next_cursor = None
+        if len(tasks) > page_size:
+            tasks = tasks[:page_size]
+            last = tasks[-1]
+            next_cursor = ('' if last[sort_by] is None else last[sort_by], last['id'])
+        
+        return _set_assignee_names(tasks, user_id), next_cursor
+    except Exception as e:
+        st.error(f"Error fetching tasks: {str(e)}")
+        skip_cache()
+        return [], None
+
+@cached
+def count_tasks(user_id=None, filters=None):
+    # Number of tasks get_tasks would return, without loading them
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        query, conditions, params = _build_task_query(user_id, filters, columns="COUNT(*)")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        cursor.execute(query, params)
+        total = cursor.fetchone()[0] + _virtual_task_count(*_recurring_series(cursor, user_id, filters))
+        
+        conn.close()
+        return total
+    except Exception as e:
+        st.error(f"Error counting tasks: {str(e)}")
+        skip_cache()
+        return 0
+
+# Dashboard Task Timeline buckets of Pending tasks by due date
+TIMELINE_BUCKETS = ['overdue', 'today', 'week']
+
+@cached
+def get_due_timeline(user_id, limit=10, days=7):
+    # The first `limit` Pending tasks (by due date) that are overdue, due today
+    # and due in the next `days` days, as {bucket: (tasks, has_more)}. One
+    # range query over the whole window instead of one query per bucket.
+    try:
+        today = datetime.now().date()
+        window_end = (today + timedelta(days=days + 1)).isoformat()
+        yesterday = (today - timedelta(days=1)).isoformat()
+        tomorrow = (today + timedelta(days=1)).isoformat()
+        week_end = (today + timedelta(days=days)).isoformat()
+        today = today.isoformat()
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        filters = {'status': 'Pending', 'due_before': window_end}
+        query, conditions, params = _build_task_query(
+            user_id,
+            filters,
+            columns="""tasks.*, users.username AS assigned_to_username,
+            CASE WHEN tasks.due_date < ? THEN 'overdue' WHEN tasks.due_date = ? THEN 'today' ELSE 'week' END AS timeline_bucket"""
+        )
+        query += " WHERE " + " AND ".join(conditions)
+        
+        # limit + 1 rows per bucket tells whether the bucket has more
+        cursor.execute(f"""
+        SELECT * FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY timeline_bucket ORDER BY due_date, id) AS timeline_rank
+            FROM ({query})
+        )
+        WHERE timeline_rank <= ?
+        """, [today, today] + params + [limit + 1])
+        tasks = [dict(row) for row in cursor.fetchall()]
+        
+        # The first limit + 1 occurrences of each series per bucket window
+        series_rows, touched, _ = _recurring_series(cursor, user_id, filters)
+        conn.close()
+        windows = {
+            'overdue': (None, yesterday),
+            'today': (today, today),
+            'week': (tomorrow, week_end)
+        }
+        for series in series_rows:
+            for bucket, (start, end) in windows.items():
+                for task in expand_series(series, start, end, touched.get(series['id'], ()), limit + 1):
+                    task['timeline_bucket'] = bucket
+                    tasks.append(task)
+        
+        tasks.sort(key=lambda t: (t['due_date'], t['id']))
+        timeline = {bucket: [] for bucket in TIMELINE_BUCKETS}
+        for task in _set_assignee_names(tasks, user_id):
+            task.pop('timeline_rank', None)
+            timeline[task.pop('timeline_bucket')].append(task)
+        
+        return {bucket: (bucket_tasks[:limit], len(bucket_tasks) > limit) for bucket, bucket_tasks in timeline.items()}
+    except Exception as e:
+        st.error(f"Error fetching task timeline: {str(e)}")
+        skip_cache()
+        return {bucket: ([], False) for bucket in TIMELINE_BUCKETS}
+
+def materialize_occurrences(task_ids):
+    # Persist virtual occurrences as real tasks the first time they are touched.
+    # Returns the real task id for each virtual id (None if it does not exist).
+    wanted = [split_virtual_id(task_id) for task_id in task_ids]
+    series_ids = list({series_id for series_id, _ in wanted})
+    if not series_ids:
+        return []
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    placeholders = ", ".join(["?"] * len(series_ids))
+    cursor.execute(
+        f"SELECT series_id, occurrence_date, id FROM tasks WHERE series_id IN ({placeholders})",
+        series_ids
+    )
+    persisted = {(row['series_id'], row['occurrence_date']): row['id'] for row in cursor.fetchall()}
+    
+    cursor.execute(
+        f"SELECT * FROM tasks WHERE id IN ({placeholders}) AND rrule IS NOT NULL",
+        series_ids
+    )
+    series_rows = {row['id']: dict(row) for row in cursor.fetchall()}
+    conn.close()
+    
+    # The expanded occurrences are already plain, non-recurring tasks
+    batch = []
+    batch_keys = []
+    for key in dict.fromkeys(wanted):
+        series = series_rows.get(key[0])
+        if key in persisted or not series:
+            continue
+        occurrences = expand_series(series, key[1], key[1])
+        if occurrences:
+            batch.append({
+                column: occurrences[0][column]
+                for column in TASK_INSERT_COLUMNS
+                if column not in ['id', 'created_date', 'modified_date']
+            })
+            batch_keys.append(key)
+    
+    new_ids, _ = add_tasks(batch, notify=False)
+    persisted.update(zip(batch_keys, new_ids))
+    
+    return [persisted.get(key) for key in wanted]
+
+def materialize_occurrence(task_id):
+    new_task_id = materialize_occurrences([task_id])[0]
+    if not new_task_id:
+        raise ValueError("Task not found")
+    return new_task_id
+
+# completed_date follows status changes (feeds the daily rollup); SET
+# expressions see the old row, so an already completed task keeps its date
+COMPLETED_DATE_SQL = (
+    "completed_date = CASE WHEN ? != 'Completed' THEN NULL "
+    "WHEN status = 'Completed' THEN completed_date ELSE ? END"
+)
+
+def update_task(task_id, updates):
+    try:
+        # Updating a virtual occurrence persists it first
+        if is_virtual_id(task_id):
+            task_id = materialize_occurrence(task_id)
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
         
         # Update modified date
-        updates['modified_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        updates['modified_date'] = now
+        
+        # Keep the series rule in step with the recurrence settings
+        if 'recurring' in updates:
+            updates['rrule'] = build_rrule(updates['recurring'], updates.get('recurrence_end_date'))
+        elif 'recurrence_end_date' in updates:
+            cursor.execute("SELECT recurring FROM tasks WHERE id = ?", (task_id,))
+            current_task = cursor.fetchone()
+            if current_task:
+                updates['rrule'] = build_rrule(current_task['recurring'], updates['recurrence_end_date'])
+        
+        # Previous assignees lose the task, so their cached reads go stale too;
+        # only tasks that really change hands get a notification
+        previous_task = None
+        if 'assigned_to' in updates or 'assigned_by' in updates:
+            cursor.execute("SELECT title, assigned_to, assigned_by FROM tasks WHERE id = ?", (task_id,))
+            previous_task = cursor.fetchone()
+        reassigned_task = None
+        if previous_task and previous_task['assigned_to'] != updates.get('assigned_to', previous_task['assigned_to']):
+            reassigned_task = previous_task
         
         # Build update query
-        set_clause = ", ".join([f"{key} = ?" for key in updates.keys()])
-        query = f"UPDATE tasks SET {set_clause} WHERE id = ?"
+        set_clauses = [f"{key} = ?" for key in updates.keys()]
+        params = list(updates.values())
+        if 'status' in updates:
+            set_clauses.append(COMPLETED_DATE_SQL)
+            params.extend([updates['status'], now])
+        query = f"UPDATE tasks SET {', '.join(set_clauses)} WHERE id = ? RETURNING assigned_to, assigned_by"
         
         # Execute update
-        cursor.execute(query, list(updates.values()) + [task_id])
+        cursor.execute(query, params + [task_id])
+        task_users = cursor.fetchall()
+        
+        if not task_users:
+            conn.rollback()
+            conn.close()
+            return False, "Task not found"
+        
+        if 'tags' in updates:
+            set_task_tags(cursor, [(task_id, updates['tags'])])
+        
+        # Triggers re-arm single task reminders; a series is re-armed here
+        arm_series_reminders(cursor, [task_id])
         
         # Create notification if assigned_to has changed
-        if 'assigned_to' in updates and updates['assigned_to'] != current_task['assigned_to']:
+        if reassigned_task:
             notification_id = str(uuid.uuid4())
-            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            message = f"You have been assigned a task: {current_task['title']}"
+            message = f"You have been assigned a task: {reassigned_task['title']}"
             
             cursor.execute('''
             INSERT INTO notifications (id, user_id, task_id, message, created_at)
@@ -178,69 +792,371 @@ def update_task(task_id, updates):
         
         conn.commit()
         conn.close()
+        refresh_facets([task_id])
+        bump_data_version(*task_users[0])
+        if previous_task:
+            bump_data_version(previous_task['assigned_to'], previous_task['assigned_by'])
         return True, "Task updated successfully"
     except Exception as e:
         return False, f"Error updating task: {str(e)}"
 
+def _add_series_exceptions(cursor, deleted_rows):
+    # Record deleted persisted occurrences (rows with series_id set) as series
+    # exceptions, in the caller's transaction
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cursor.executemany('''
+    INSERT OR IGNORE INTO task_series_exceptions (series_id, occurrence_date, created_at)
+    VALUES (?, ?, ?)
+    ''', [
+        (row['series_id'], row['occurrence_date'], now)
+        for row in deleted_rows
+        if row['series_id'] and row['occurrence_date']
+    ])
+
 def delete_task(task_id):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
+        # A virtual occurrence is deleted by recording an exception for its date
+        if is_virtual_id(task_id):
+            series_id, occurrence_date = split_virtual_id(task_id)
+            cursor.execute('''
+            INSERT OR IGNORE INTO task_series_exceptions (series_id, occurrence_date, created_at)
+            VALUES (?, ?, ?)
+            ''', (series_id, occurrence_date, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            conn.commit()
+            bump_data_version(*_task_users(cursor, [series_id]))
+            conn.close()
+            return True, "Task deleted successfully"
+        
         # Delete related notifications first
         cursor.execute("DELETE FROM notifications WHERE task_id = ?", (task_id,))
         
         # Delete the task
-        cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        cursor.execute("""
+        DELETE FROM tasks WHERE id = ?
+        RETURNING assigned_to, assigned_by, series_id, occurrence_date
+        """, (task_id,))
+        deleted = cursor.fetchall()
+        task_users = [user_id for row in deleted for user_id in (row['assigned_to'], row['assigned_by'])]
+        
+        # A persisted occurrence must not come back as a virtual one
+        _add_series_exceptions(cursor, deleted)
         
         conn.commit()
         conn.close()
+        refresh_facets([task_id])
+        bump_data_version(*task_users)
         return True, "Task deleted successfully"
     except Exception as e:
         return False, f"Error deleting task: {str(e)}"
 
-def get_task_statistics(user_id):
+def _resolve_bulk_task_ids(cursor, task_ids=None, user_id=None, filters=None):
+    # Bulk operations take either explicit ids or the same filters as get_tasks
+    if task_ids is None:
+        query, conditions, params = _build_task_query(user_id, filters, columns="tasks.id")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        cursor.execute(query, params)
+        task_ids = [row['id'] for row in cursor.fetchall()]
+        
+        # Every matching occurrence, but only its id
+        series_rows, touched, window = _recurring_series(cursor, user_id, filters)
+        for series in series_rows:
+            skip_dates = touched.get(series['id'], ())
+            task_ids += [
+                make_virtual_id(series['id'], day)
+                for _, day in occurrence_dates(series['rrule'], series['due_date'], window[0], window[1])
+                if day not in skip_dates
+            ]
+    
+    real_ids = [task_id for task_id in task_ids if not is_virtual_id(task_id)]
+    virtual_ids = [task_id for task_id in task_ids if is_virtual_id(task_id)]
+    return real_ids, virtual_ids
+
+def _id_chunks(task_ids, chunk_size=BULK_CHUNK_SIZE):
+    for start in range(0, len(task_ids), chunk_size):
+        chunk = task_ids[start:start + chunk_size]
+        yield chunk, ", ".join(["?"] * len(chunk))
+
+def _task_users(cursor, task_ids):
+    # Everyone the given tasks are assigned to or by
+    users = set()
+    for chunk, placeholders in _id_chunks(list(task_ids)):
+        cursor.execute(f"SELECT assigned_to, assigned_by FROM tasks WHERE id IN ({placeholders})", chunk)
+        for row in cursor.fetchall():
+            users.update(row)
+    return users
+
+def bulk_update_status(status, task_ids=None, user_id=None, filters=None):
     try:
+        if status not in TASK_STATUSES:
+            return False, f"Invalid status: {status}"
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Get all tasks for the user
-        cursor.execute("""
-        SELECT * FROM tasks 
-        WHERE assigned_to = ? OR assigned_by = ?
-        """, (user_id, user_id))
+        real_ids, virtual_ids = _resolve_bulk_task_ids(cursor, task_ids, user_id, filters)
+        real_ids += [task_id for task_id in materialize_occurrences(virtual_ids) if task_id]
+        
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        updated = 0
+        task_users = set()
+        
+        # One UPDATE statement and one transaction per chunk
+        for chunk, placeholders in _id_chunks(real_ids):
+            cursor.execute(f"""
+            UPDATE tasks SET status = ?, modified_date = ?, {COMPLETED_DATE_SQL}
+            WHERE id IN ({placeholders}) AND status != ?
+            RETURNING assigned_to, assigned_by
+            """, [status, now, status, now] + chunk + [status])
+            rows = cursor.fetchall()
+            updated += len(rows)
+            task_users.update(user_id for row in rows for user_id in row)
+            arm_series_reminders(cursor, chunk)
+            conn.commit()
+        
+        conn.close()
+        refresh_facets(real_ids)
+        bump_data_version(*task_users)
+        return True, f"Updated {updated} tasks"
+    except Exception as e:
+        return False, f"Error updating tasks: {str(e)}"
+
+def bulk_reassign(assigned_to, task_ids=None, user_id=None, filters=None):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        real_ids, virtual_ids = _resolve_bulk_task_ids(cursor, task_ids, user_id, filters)
+        real_ids += [task_id for task_id in materialize_occurrences(virtual_ids) if task_id]
+        
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        reassigned = 0
+        task_users = {assigned_to}
+        
+        for chunk, placeholders in _id_chunks(real_ids):
+            # Tasks that actually change hands get a notification
+            cursor.execute(f"""
+            SELECT id, title, assigned_to, assigned_by FROM tasks
+            WHERE id IN ({placeholders}) AND assigned_to != ?
+            """, chunk + [assigned_to])
+            moved = cursor.fetchall()
+            
+            cursor.execute(f"""
+            UPDATE tasks SET assigned_to = ?, modified_date = ?
+            WHERE id IN ({placeholders}) AND assigned_to != ?
+            """, [assigned_to, now] + chunk + [assigned_to])
+            
+            cursor.executemany('''
+            INSERT INTO notifications (id, user_id, task_id, message, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            ''', [
+                (str(uuid.uuid4()), assigned_to, task['id'], f"You have been assigned a task: {task['title']}", now)
+                for task in moved
+            ])
+            
+            reassigned += len(moved)
+            task_users.update(user_id for task in moved for user_id in (task['assigned_to'], task['assigned_by']))
+            conn.commit()
+        
+        conn.close()
+        refresh_facets(real_ids)
+        bump_data_version(*task_users)
+        return True, f"Reassigned {reassigned} tasks"
+    except Exception as e:
+        return False, f"Error reassigning tasks: {str(e)}"
+
+def bulk_delete(task_ids=None, user_id=None, filters=None):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        real_ids, virtual_ids = _resolve_bulk_task_ids(cursor, task_ids, user_id, filters)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        deleted = 0
+        
+        # Occurrences of a series that is deleted too go away with it
+        deleted_series = set(real_ids)
+        deleted += sum(1 for task_id in virtual_ids if split_virtual_id(task_id)[0] in deleted_series)
+        virtual_ids = [task_id for task_id in virtual_ids if split_virtual_id(task_id)[0] not in deleted_series]
+        
+        # Virtual occurrences are deleted by recording exceptions
+        task_users = _task_users(cursor, {split_virtual_id(task_id)[0] for task_id in virtual_ids})
+        cursor.executemany('''
+        INSERT OR IGNORE INTO task_series_exceptions (series_id, occurrence_date, created_at)
+        VALUES (?, ?, ?)
+        ''', [split_virtual_id(task_id) + (now,) for task_id in virtual_ids])
+        deleted += len(virtual_ids)
+        conn.commit()
+        
+        for chunk, placeholders in _id_chunks(real_ids):
+            # Delete related notifications first
+            cursor.execute(f"DELETE FROM notifications WHERE task_id IN ({placeholders})", chunk)
+            cursor.execute(f"""
+            DELETE FROM tasks WHERE id IN ({placeholders})
+            RETURNING assigned_to, assigned_by, series_id, occurrence_date
+            """, chunk)
+            rows = cursor.fetchall()
+            _add_series_exceptions(cursor, rows)
+            deleted += len(rows)
+            task_users.update(user_id for row in rows for user_id in (row['assigned_to'], row['assigned_by']))
+            conn.commit()
+        
+        conn.close()
+        refresh_facets(real_ids)
+        bump_data_version(*task_users)
+        return True, f"Deleted {deleted} tasks"
+    except Exception as e:
+        return False, f"Error deleting tasks: {str(e)}"
+
+def _add_virtual_facet_counts(cursor, user_id, filters, counts):
+    # The bitmaps only cover stored rows; add the untouched occurrences of
+    # the matching series, each facet counted without its own filter like
+    # FacetIndex.counts does
+    counts['total'] += _virtual_task_count(*_recurring_series(cursor, user_id, filters))
+    for facet in FACETS:
+        skipped = ['tags', 'tag_match'] if facet == 'tags' else [facet]
+        series_rows, touched, window = _recurring_series(
+            cursor, user_id, {k: v for k, v in filters.items() if k not in skipped}
+        )
+        facet_counts = counts[facet]
+        names = {name.lower(): name for name in facet_counts} if facet == 'tags' else {}
+        for series in series_rows:
+            count = _virtual_task_count([series], touched, window)
+            if not count:
+                continue
+            # Occurrences start out Pending
+            values = ['Pending'] if facet == 'status' else [series[facet]]
+            if facet == 'tags':
+                values = [names.get(name.lower(), name) for name in parse_tags(series['tags'])]
+            for value in values:
+                facet_counts[value] = facet_counts.get(value, 0) + count
+
+def get_facet_counts(user_id=None, filters=None):
+    # Facet counts for View Tasks from the in-process bitmap index, or None
+    # when it is disabled. Filters the index does not cover (search, due date)
+    # are resolved in SQL and intersected with the bitmaps.
+    facet_index = get_facet_index()
+    if facet_index is None:
+        return None
+    
+    try:
+        filters = filters or {}
+        facet_filters = {k: v for k, v in filters.items() if k in FACETS or k == 'tag_match'}
+        other_filters = {k: v for k, v in filters.items() if k not in facet_filters}
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        restrict = None
+        if other_filters:
+            query, conditions, params = _build_task_query(user_id, other_filters, columns="tasks.rowid")
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            cursor.execute(query, params)
+            restrict = rowid_bitmap(row[0] for row in cursor.fetchall())
+        
+        counts = facet_index.counts(user_id, facet_filters, restrict)
+        _add_virtual_facet_counts(cursor, user_id, filters, counts)
         
-        tasks = [dict(row) for row in cursor.fetchall()]
         conn.close()
+        return counts
+    except Exception as e:
+        st.error(f"Error fetching facet counts: {str(e)}")
+        return None
+
+@cached
+def get_task_statistics(user_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        today = datetime.now().date()
+        week_end = today + timedelta(days=7)
+        user_scope = "(assigned_to = ? OR assigned_by = ?)"
         
-        # Calculate statistics
+        # Totals come from the trigger-maintained counters instead of the tasks table
         stats = {
-            'total': len(tasks),
-            'completed': len([t for t in tasks if t['status'] == 'Completed']),
-            'pending': len([t for t in tasks if t['status'] == 'Pending']),
-            'in_progress': len([t for t in tasks if t['status'] == 'In Progress']),
+            'total': 0,
+            'completed': 0,
+            'pending': 0,
+            'in_progress': 0,
             'overdue': 0,
             'due_today': 0,
             'due_this_week': 0,
-            'priority_high': len([t for t in tasks if t['priority'] == 'High']),
-            'priority_medium': len([t for t in tasks if t['priority'] == 'Medium']),
-            'priority_low': len([t for t in tasks if t['priority'] == 'Low']),
-            'time_spent': sum([t['time_spent'] or 0 for t in tasks]),
-            'estimated_time': sum([t['time_estimate'] or 0 for t in tasks])
+            'priority_high': 0,
+            'priority_medium': 0,
+            'priority_low': 0,
+            'time_spent': 0,
+            'estimated_time': 0
         }
+        status_count = {}
+        priority_count = {}
         
-        # Calculate date-based statistics
-        today = datetime.now().date()
-        for task in tasks:
-            if task['due_date'] and task['status'] != 'Completed':
-                due_date = datetime.strptime(task['due_date'], "%Y-%m-%d").date()
-                
-                if due_date < today:
-                    stats['overdue'] += 1
-                elif due_date == today:
-                    stats['due_today'] += 1
-                elif due_date <= today + timedelta(days=7):
-                    stats['due_this_week'] += 1
+        for counter in get_task_counters(user_id):
+            count = counter['task_count']
+            stats['total'] += count
+            stats['time_spent'] += counter['time_spent']
+            stats['estimated_time'] += counter['time_estimate']
+            status_count[counter['status']] = status_count.get(counter['status'], 0) + count
+            priority_count[counter['priority']] = priority_count.get(counter['priority'], 0) + count
+        
+        # Virtual occurrences of recurring series count like real (Pending)
+        # tasks; their numbers come from the rules, nothing is expanded
+        series_rows, touched, _ = _recurring_series(cursor, user_id)
+        for series in series_rows:
+            count = _virtual_task_count([series], touched, (None, None))
+            stats['total'] += count
+            stats['estimated_time'] += count * (series['time_estimate'] or 0)
+            status_count['Pending'] = status_count.get('Pending', 0) + count
+            priority_count[series['priority']] = priority_count.get(series['priority'], 0) + count
+        
+        stats['completed'] = status_count.get('Completed', 0)
+        stats['pending'] = status_count.get('Pending', 0)
+        stats['in_progress'] = status_count.get('In Progress', 0)
+        stats['priority_high'] = priority_count.get('High', 0)
+        stats['priority_medium'] = priority_count.get('Medium', 0)
+        stats['priority_low'] = priority_count.get('Low', 0)
+        stats['status_distribution'] = {k: v for k, v in status_count.items() if v}
+        stats['priority_distribution'] = {k: v for k, v in priority_count.items() if v}
+        
+        # Date buckets depend on today's date, so they are an indexed range count
+        cursor.execute(f"""
+        SELECT
+            IFNULL(SUM(due_date < ?), 0) AS overdue,
+            IFNULL(SUM(due_date = ?), 0) AS due_today,
+            IFNULL(SUM(due_date > ?), 0) AS due_this_week
+        FROM tasks
+        WHERE {user_scope} AND status != 'Completed'
+          AND due_date IS NOT NULL AND due_date != '' AND due_date <= ?
+        """, (
+            today.isoformat(),
+            today.isoformat(),
+            today.isoformat(),
+            user_id,
+            user_id,
+            week_end.isoformat()
+        ))
+        stats.update(dict(cursor.fetchone()))
+        
+        date_buckets = {
+            'overdue': (None, (today - timedelta(days=1)).isoformat()),
+            'due_today': (today.isoformat(), today.isoformat()),
+            'due_this_week': ((today + timedelta(days=1)).isoformat(), week_end.isoformat())
+        }
+        for bucket, window in date_buckets.items():
+            stats[bucket] += _virtual_task_count(series_rows, touched, window)
+        
+        # Calculate trending data (tasks by creation date) from the daily rollup
+        stats['task_trend'] = {
+            row['day']: row['created']
+            for row in get_task_trend(user_id)
+            if row['created']
+        }
+        
+        conn.close()
         
         # Calculate completion rate
         if stats['total'] > 0:
@@ -254,38 +1170,16 @@ def get_task_statistics(user_id):
         else:
             stats['time_efficiency'] = 0
         
-        # Calculate trending data (tasks by creation date)
-        task_dates = {}
-        for task in tasks:
-            date = task['created_date'].split(' ')[0]  # Get just the date part
-            if date in task_dates:
-                task_dates[date] += 1
-            else:
-                task_dates[date] = 1
-        
-        stats['task_trend'] = task_dates
-        
-        # Calculate status distribution
-        status_count = {}
-        for task in tasks:
-            status = task['status']
-            if status in status_count:
-                status_count[status] += 1
-            else:
-                status_count[status] = 1
-        
-        stats['status_distribution'] = status_count
-        
-        # Calculate priority distribution
-        priority_count = {}
-        for task in tasks:
-            priority = task['priority']
-            if priority in priority_count:
-                priority_count[priority] += 1
-            else:
-                priority_count[priority] = 1
-        
         return stats
     except Exception as e:
         st.error(f"Error calculating statistics: {str(e)}")
+        skip_cache()
         return {}
+
+@cached
+def get_task_trend(user_id, start_day=None, end_day=None):
+    # Daily created/completed/overdue counts for a bounded range (default: last TREND_DAYS days)
+    today = datetime.now().date()
+    end_day = end_day or today.isoformat()
+    start_day = start_day or (today - timedelta(days=TREND_DAYS)).isoformat()
+    return get_daily_rollup(user_id, start_day, end_day)